@@ -0,0 +1,49 @@
+"""Add detected language to files.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add files.language and backfill it from existing filenames."""
+    from app.services.chunking import detect_language_by_ext, file_extension
+
+    op.add_column("files", sa.Column("language", sa.String(32), nullable=True))
+    op.create_index("ix_files_library_language", "files", ["library_id", "language"])
+
+    # Backfill: one UPDATE per language rather than one per row, detecting
+    # once per distinct extension
+    conn = op.get_bind()
+    ext_to_language = {}
+    ids_by_language = {}
+    for file_id, filename in conn.execute(sa.text("SELECT id, filename FROM files")):
+        ext = file_extension(filename)
+        language = ext_to_language.get(ext)
+        if language is None:
+            language = ext_to_language[ext] = detect_language_by_ext(ext).value
+        ids_by_language.setdefault(language, []).append(file_id)
+
+    for language, ids in ids_by_language.items():
+        conn.execute(
+            sa.text("UPDATE files SET language = :language WHERE id = ANY(:ids)"),
+            {"language": language, "ids": ids},
+        )
+
+
+def downgrade() -> None:
+    """Drop files.language."""
+    op.drop_index("ix_files_library_language", table_name="files")
+    op.drop_column("files", "language")
@@ -0,0 +1,39 @@
+"""Add partial indexes on non-deleted files.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index library_id and language for rows that are not soft-deleted."""
+    op.create_index(
+        "ix_files_active_library",
+        "files",
+        ["library_id"],
+        postgresql_where=sa.text("is_deleted = false"),
+    )
+    op.create_index(
+        "ix_files_active_language",
+        "files",
+        ["language"],
+        postgresql_where=sa.text("is_deleted = false"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the partial indexes."""
+    op.drop_index("ix_files_active_language", table_name="files")
+    op.drop_index("ix_files_active_library", table_name="files")
@@ -0,0 +1,30 @@
+"""Add a (created_by, expires_at) index on share links.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index share links by owner and expiry."""
+    op.create_index(
+        "ix_share_links_created_by_expires_at",
+        "share_links",
+        ["created_by", "expires_at"],
+    )
+
+
+def downgrade() -> None:
+    """Drop the owner/expiry index."""
+    op.drop_index("ix_share_links_created_by_expires_at", table_name="share_links")
@@ -0,0 +1,39 @@
+"""Add partial indexes for paging through the trash.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index (deleted_at, id) for soft-deleted files and directories."""
+    op.create_index(
+        "ix_files_trash",
+        "files",
+        ["deleted_at", "id"],
+        postgresql_where=sa.text("is_deleted = true"),
+    )
+    op.create_index(
+        "ix_directories_trash",
+        "directories",
+        ["deleted_at", "id"],
+        postgresql_where=sa.text("is_deleted = true"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the trash indexes."""
+    op.drop_index("ix_directories_trash", table_name="directories")
+    op.drop_index("ix_files_trash", table_name="files")
@@ -1,7 +1,9 @@
 """API dependencies for injection."""
 
 import uuid
-from typing import Annotated, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Dict, List, Optional
 
 from fastapi import Depends, HTTPException, Path, Query, status
 from sqlalchemy import select
@@ -10,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import UserContext, get_current_user, require_roles
 from app.models import Library, Directory, FileMetadata
-from app.services.cache import CacheService, get_cache_service
+from app.services.cache import CacheService, file_lookup_cache, get_cache_service
 from app.services.storage import StorageService, get_storage_service
 
 # Type aliases for cleaner dependency injection
@@ -119,6 +121,99 @@ async def get_file_or_404(
 FileDep = Annotated[FileMetadata, Depends(get_file_or_404)]
 
 
+@dataclass(frozen=True)
+class FileLookup:
+    """Snapshot of the file fields needed to locate and describe its content."""
+
+    id: uuid.UUID
+    library_id: uuid.UUID
+    bucket_name: str
+    storage_key: str
+    filename: str
+    content_type: str
+    size_bytes: int
+    updated_at: datetime
+
+
+# Columns selected for FileLookup, in field order
+_FILE_LOOKUP_COLUMNS = (
+    FileMetadata.id,
+    FileMetadata.library_id,
+    Library.bucket_name,
+    FileMetadata.storage_key,
+    FileMetadata.filename,
+    FileMetadata.content_type,
+    FileMetadata.size_bytes,
+    FileMetadata.updated_at,
+)
+
+
+async def get_file_lookup(
+    db: AsyncSession,
+    file_id: uuid.UUID,
+) -> Optional[FileLookup]:
+    """
+    Get a non-deleted file with its bucket, served from a short-lived cache.
+
+    Returns None if the file does not exist or is deleted.
+    """
+    lookup = file_lookup_cache.get(file_id)
+    if lookup is not None:
+        return lookup
+
+    result = await db.execute(
+        select(*_FILE_LOOKUP_COLUMNS)
+        .join(Library, Library.id == FileMetadata.library_id)
+        .where(
+            FileMetadata.id == file_id,
+            FileMetadata.is_deleted == False,
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    lookup = FileLookup(*row)
+    file_lookup_cache.set(file_id, lookup)
+    return lookup
+
+
+async def get_file_lookups(
+    db: AsyncSession,
+    file_ids: List[uuid.UUID],
+) -> Dict[uuid.UUID, FileLookup]:
+    """
+    Get several non-deleted files at once (see get_file_lookup).
+
+    Cache misses are fetched in a single query; missing or deleted files
+    are left out of the result.
+    """
+    lookups: Dict[uuid.UUID, FileLookup] = {}
+    missing = []
+    for file_id in file_ids:
+        lookup = file_lookup_cache.get(file_id)
+        if lookup is not None:
+            lookups[file_id] = lookup
+        else:
+            missing.append(file_id)
+
+    if missing:
+        result = await db.execute(
+            select(*_FILE_LOOKUP_COLUMNS)
+            .join(Library, Library.id == FileMetadata.library_id)
+            .where(
+                FileMetadata.id.in_(missing),
+                FileMetadata.is_deleted == False,
+            )
+        )
+        for row in result.all():
+            lookup = FileLookup(*row)
+            file_lookup_cache.set(lookup.id, lookup)
+            lookups[lookup.id] = lookup
+
+    return lookups
+
+
 # ==========================================================================
 # Pagination Dependencies
 # ==========================================================================
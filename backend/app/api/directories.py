@@ -20,6 +20,7 @@ from app.schemas.directory import (
     DirectoryResponse,
     DirectoryUpdate,
 )
+from app.services.cache import file_lookup_cache
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -456,6 +457,7 @@ async def _soft_delete_recursive(
 
     for file in files:
         file.soft_delete(user_id)
+        file_lookup_cache.delete(file.id)
 
     # Soft delete the directory itself
     directory.soft_delete(user_id)
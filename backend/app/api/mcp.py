@@ -1,17 +1,25 @@
 """API endpoints for MCP server access."""
 
-import json
 import uuid
+from functools import lru_cache
 from typing import Optional
 
+import orjson
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
 from app.core.config import settings
-from app.mcp.server import LibraryPolicy, MCPServer, RateLimitConfig, create_mcp_server
+from app.core.security import UserContext
+from app.mcp.server import (
+    LibraryPolicy,
+    MCPServer,
+    RateLimitConfig,
+    create_mcp_server,
+    dump_tool_result,
+)
 
 # Official MCP SSE transport (LM Studio expects this handshake)
 from mcp.server.sse import SseServerTransport
@@ -19,11 +27,23 @@ from mcp.server.sse import SseServerTransport
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 
+# Settings are loaded once at startup; keep the hot-path flag in a module local
+_MCP_ENABLED = settings.mcp_enabled
+
 # Global MCP server instance (initialized on first request)
 _mcp_server: Optional[MCPServer] = None
 
-# Global SSE transport so sessions survive across requests
-_mcp_sse_transport: Optional[SseServerTransport] = None
+
+# Prebuilt JSON-RPC envelope for the `notifications/initialized` acknowledgement;
+# only the request id is spliced in.
+_EMPTY_RESULT_PREFIX = b'{"jsonrpc":"2.0","result":{},"id":'
+
+
+@lru_cache(maxsize=1)
+def _get_sse_transport() -> SseServerTransport:
+    """Get the shared SSE transport so sessions survive across requests."""
+    # The client will POST JSON-RPC messages to this endpoint (with ?session_id=...)
+    return SseServerTransport(f"{settings.api_prefix}/mcp/messages")
 
 
 def get_mcp_server(db: AsyncSession = Depends(get_db)) -> MCPServer:
@@ -56,21 +76,18 @@ async def mcp_sse_main(
     server: MCPServer = Depends(get_mcp_server),
 ):
     """SSE endpoint for MCP communication (official MCP SSE transport)."""
-    if not settings.mcp_enabled:
+    if not _MCP_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP server is disabled",
         )
 
-    global _mcp_sse_transport
-    if _mcp_sse_transport is None:
-        # The client will POST JSON-RPC messages to this endpoint (with ?session_id=...)
-        _mcp_sse_transport = SseServerTransport(f"{settings.api_prefix}/mcp/messages")
+    transport = _get_sse_transport()
 
     # LM Studio expects the MCP SSE handshake:
     # - server sends `event: endpoint` with a POST URL containing session_id
     # - server streams `event: message` JSON-RPC messages
-    async with _mcp_sse_transport.connect_sse(
+    async with transport.connect_sse(
         request.scope, request.receive, request._send  # type: ignore[attr-defined]
     ) as (read_stream, write_stream):
         await server._server.run(  # pylint: disable=protected-access
@@ -91,12 +108,8 @@ async def mcp_sse_main(
 )
 async def mcp_sse_messages(request: Request):
     """Handle POSTed MCP JSON-RPC messages for an established SSE session."""
-    global _mcp_sse_transport
-    if _mcp_sse_transport is None:
-        _mcp_sse_transport = SseServerTransport(f"{settings.api_prefix}/mcp/messages")
-
     # The transport will validate session_id and JSON-RPC payload.
-    await _mcp_sse_transport.handle_post_message(
+    await _get_sse_transport().handle_post_message(
         request.scope, request.receive, request._send  # type: ignore[attr-defined]
     )
     return {"status": "accepted"}
@@ -112,7 +125,7 @@ async def mcp_jsonrpc(
     server: MCPServer = Depends(get_mcp_server),
 ):
     """Handle MCP JSON-RPC requests."""
-    if not settings.mcp_enabled:
+    if not _MCP_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP server is disabled",
@@ -127,6 +140,13 @@ async def mcp_jsonrpc(
     params = body.get("params", {})
     request_id = body.get("id")
 
+    # Client notification, no response needed
+    if method == "notifications/initialized":
+        return Response(
+            content=_EMPTY_RESULT_PREFIX + orjson.dumps(request_id) + b"}",
+            media_type="application/json",
+        )
+
     # Handle standard MCP methods
     if method == "initialize":
         return {
@@ -171,7 +191,7 @@ async def mcp_jsonrpc(
             return {
                 "jsonrpc": "2.0",
                 "result": {
-                    "content": [{"type": "text", "text": json.dumps(result)}],
+                    "content": [{"type": "text", "text": dump_tool_result(result)}],
                     "isError": False,
                 },
                 "id": request_id,
@@ -187,10 +207,6 @@ async def mcp_jsonrpc(
                 "id": request_id,
             }
 
-    elif method == "notifications/initialized":
-        # Client notification, no response needed
-        return {"jsonrpc": "2.0", "result": {}, "id": request_id}
-
     else:
         return {
             "jsonrpc": "2.0",
@@ -205,11 +221,11 @@ async def mcp_jsonrpc(
     description="Get MCP server status and configuration.",
 )
 async def get_mcp_status(
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Get MCP server status."""
     return {
-        "enabled": settings.mcp_enabled,
+        "enabled": _MCP_ENABLED,
         "rate_limit": {
             "requests_per_minute": settings.mcp_rate_limit_requests,
             "window_seconds": settings.mcp_rate_limit_window,
@@ -228,7 +244,7 @@ async def mcp_sse_endpoint(
     server: MCPServer = Depends(get_mcp_server),
 ):
     """SSE endpoint for MCP communication."""
-    if not settings.mcp_enabled:
+    if not _MCP_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP server is disabled",
@@ -248,7 +264,7 @@ async def call_mcp_tool(
     server: MCPServer = Depends(get_mcp_server),
 ):
     """Call an MCP tool directly."""
-    if not settings.mcp_enabled:
+    if not _MCP_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP server is disabled",
@@ -302,7 +318,7 @@ async def list_mcp_tools(
     server: MCPServer = Depends(get_mcp_server),
 ):
     """List available MCP tools."""
-    if not settings.mcp_enabled:
+    if not _MCP_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP server is disabled",
@@ -322,7 +338,7 @@ async def set_library_policy(
     library_id: uuid.UUID,
     read_enabled: bool = Query(True, description="Allow read access"),
     write_enabled: bool = Query(False, description="Allow write access"),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     server: MCPServer = Depends(get_mcp_server),
 ):
     """Set MCP access policy for a library."""
@@ -339,7 +355,7 @@ async def set_library_policy(
         library_id=str(library_id),
         read_enabled=read_enabled,
         write_enabled=write_enabled,
-        user_id=current_user["sub"],
+        user_id=str(current_user.user_id),
     )
 
     return {
@@ -356,7 +372,7 @@ async def set_library_policy(
 )
 async def get_library_policy(
     library_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     server: MCPServer = Depends(get_mcp_server),
 ):
     """Get MCP access policy for a library."""
@@ -366,5 +382,9 @@ async def get_library_policy(
         "library_id": str(library_id),
         "read_enabled": policy.read_enabled,
         "write_enabled": policy.write_enabled,
-        "allowed_agents": policy.allowed_agents,
+        "allowed_agents": (
+            sorted(policy.allowed_agents)
+            if policy.allowed_agents is not None
+            else None
+        ),
     }
@@ -8,16 +8,27 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.core.security import UserContext
 from app.schemas.notification import (
     NotificationListResponse,
     NotificationResponse,
     NotificationUpdate,
 )
+from app.services.cache import LocalTTLCache
 from app.services.notification import NotificationService
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
+# Short-lived per-user cache of notification listings to absorb UI polling.
+# Keys are (user_id, unread_only, limit, offset).
+_list_cache = LocalTTLCache(ttl_seconds=2.5)
+
+
+def _invalidate_user_listings(user_id: uuid.UUID) -> None:
+    """Drop all cached notification listings for a user."""
+    _list_cache.delete_where(lambda key: key[0] == user_id)
+
 
 def get_notification_service(
     db: AsyncSession = Depends(get_db),
@@ -36,16 +47,25 @@ async def list_notifications(
     unread_only: bool = Query(False, description="Only return unread notifications"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of notifications"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: NotificationService = Depends(get_notification_service),
 ):
     """List notifications for the current user."""
-    return await service.get_notifications(
-        user_id=uuid.UUID(current_user["sub"]),
+    user_id = current_user.user_id
+    cache_key = (user_id, unread_only, limit, offset)
+
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    notifications = await service.get_notifications(
+        user_id=user_id,
         unread_only=unread_only,
         limit=limit,
         offset=offset,
     )
+    _list_cache.set(cache_key, notifications)
+    return notifications
 
 
 @router.post(
@@ -56,14 +76,16 @@ async def list_notifications(
 )
 async def mark_notification_read(
     notification_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: NotificationService = Depends(get_notification_service),
 ):
     """Mark a notification as read."""
+    user_id = current_user.user_id
     success = await service.mark_as_read(
         notification_id=notification_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=user_id,
     )
+    _invalidate_user_listings(user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,13 +100,13 @@ async def mark_notification_read(
     description="Mark all notifications as read for the current user.",
 )
 async def mark_all_notifications_read(
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: NotificationService = Depends(get_notification_service),
 ):
     """Mark all notifications as read."""
-    count = await service.mark_all_as_read(
-        user_id=uuid.UUID(current_user["sub"]),
-    )
+    user_id = current_user.user_id
+    count = await service.mark_all_as_read(user_id=user_id)
+    _invalidate_user_listings(user_id)
     return {"marked_read": count}
 
 
@@ -96,14 +118,16 @@ async def mark_all_notifications_read(
 )
 async def delete_notification(
     notification_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: NotificationService = Depends(get_notification_service),
 ):
     """Delete a notification."""
+    user_id = current_user.user_id
     success = await service.delete_notification(
         notification_id=notification_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=user_id,
     )
+    _invalidate_user_listings(user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,41 +1,197 @@
 """API endpoints for file previews."""
 
+import asyncio
+import hashlib
 import uuid
+from typing import AsyncIterator, List, Optional
+from urllib.parse import quote
 
+import orjson
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import Response
-from sqlalchemy import and_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import (
+    FileLookup,
+    get_current_user,
+    get_db,
+    get_file_lookup,
+    get_file_lookups,
+)
 from app.core.config import settings
-from app.models.file import FileMetadata
-from app.models.library import Library
-from app.services.preview import PreviewService, PREVIEWABLE_TYPES
+from app.services.cache import get_cache_service
+from app.services.preview import PreviewCacheService, PreviewService, PREVIEWABLE_TYPES
 from app.services.storage import StorageService, get_storage_service
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/preview", tags=["preview"])
 
+# Settings are loaded once at startup; keep hot-path values in module locals
+_PREVIEW_ENABLED = settings.preview_enabled
+_PREVIEW_MAX_FILE_SIZE = settings.preview_max_file_size
+
+# Static for the life of the process: serialize once and let clients revalidate
+_SUPPORTED_PAYLOAD = orjson.dumps({
+    "supported_types": sorted(PREVIEWABLE_TYPES.keys()),
+    "max_file_size": _PREVIEW_MAX_FILE_SIZE,
+    "enabled": _PREVIEW_ENABLED,
+})
+_SUPPORTED_ETAG = f'"{hashlib.blake2b(_SUPPORTED_PAYLOAD, digest_size=16).hexdigest()}"'
+
+# Sources up to this size are fetched speculatively alongside the preview
+# cache lookup; on a cache hit the GET is cancelled and little is wasted
+_SPECULATIVE_DOWNLOAD_MAX_BYTES = 1024 * 1024
+
+
+def _discard_task_result(task: asyncio.Task) -> None:
+    """Retrieve an abandoned task's outcome so asyncio doesn't log it."""
+    if not task.cancelled():
+        task.exception()
+
+
+class PreviewCheckBatchRequest(BaseModel):
+    """Files to check for preview availability."""
+
+    file_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=500)
+
 
 def get_preview_service() -> PreviewService:
     """Get preview service dependency."""
     return PreviewService()
 
 
+async def get_preview_cache() -> Optional[PreviewCacheService]:
+    """Get preview cache dependency (None when Redis is unavailable)."""
+    try:
+        return PreviewCacheService(await get_cache_service())
+    except Exception as e:
+        logger.warning("preview_cache_unavailable", error=str(e))
+        return None
+
+
+def _preview_etag(
+    file: FileLookup,
+    thumbnail: bool,
+    width: int,
+    height: int,
+) -> str:
+    """Build a strong ETag for a rendered preview of a file version."""
+    digest = hashlib.blake2b(
+        (
+            f"{file.id}:{file.updated_at.timestamp()}:{file.size_bytes}:"
+            f"{thumbnail}:{width}x{height}"
+        ).encode(),
+        digest_size=16,
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _inline_content_disposition(filename: str) -> str:
+    """Build an inline Content-Disposition header value (RFC 5987)."""
+    # Plain ASCII names (the common case) need no fallback or percent-encoding
+    if filename.isascii() and not any(c in filename for c in '"\\\r\n'):
+        return f'inline; filename="{filename}"'
+
+    # Create ASCII-safe fallback filename
+    ascii_filename = filename.encode(
+        'ascii', 'replace'
+    ).decode('ascii').replace('?', '_').replace('"', '_')
+    # Create UTF-8 encoded filename for modern browsers
+    utf8_filename = quote(filename, safe='')
+
+    return (
+        f"inline; filename=\"{ascii_filename}\"; "
+        f"filename*=UTF-8''{utf8_filename}"
+    )
+
+
+async def _prepend_chunk(
+    first_chunk: bytes,
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """Relay a stream whose first chunk was already pulled."""
+    yield first_chunk
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _stream_and_cache(
+    first_chunk: bytes,
+    chunks: AsyncIterator[bytes],
+    preview_cache: Optional[PreviewCacheService],
+    file_id: uuid.UUID,
+    cache_variant: str,
+) -> AsyncIterator[bytes]:
+    """Relay a converted preview to the client, caching it if it is small."""
+    buffer = bytearray(first_chunk)
+    cacheable = preview_cache is not None
+    yield first_chunk
+
+    try:
+        async for chunk in chunks:
+            if cacheable:
+                buffer += chunk
+                if len(buffer) > PreviewCacheService.MAX_CACHED_BYTES:
+                    cacheable = False
+                    buffer = bytearray()
+            yield chunk
+    except ValueError as e:
+        # Headers are already sent; all we can do is cut the stream short
+        logger.error("preview_stream_error", file_id=str(file_id), error=str(e))
+        return
+
+    if cacheable:
+        await preview_cache.set_preview(
+            file_id,
+            bytes(buffer),
+            "application/pdf",
+            preview_type=cache_variant,
+            ttl=3600,
+        )
+
+
+def _preview_availability(
+    file: FileLookup,
+    preview_service: PreviewService,
+) -> dict:
+    """Describe whether a preview can be generated for a file."""
+    can_preview = preview_service.can_preview(file.content_type)
+    needs_conversion = preview_service.needs_conversion(file.content_type)
+    size_ok = (
+        not file.size_bytes or
+        file.size_bytes <= _PREVIEW_MAX_FILE_SIZE
+    )
+
+    return {
+        "file_id": str(file.id),
+        "mime_type": file.content_type,
+        "can_preview": can_preview and size_ok and _PREVIEW_ENABLED,
+        "needs_conversion": needs_conversion,
+        "size_ok": size_ok,
+        "service_enabled": _PREVIEW_ENABLED,
+    }
+
+
 @router.get(
     "/supported",
     summary="Get supported preview types",
     description="Get list of MIME types that support preview.",
 )
-async def get_supported_types():
+async def get_supported_types(request: Request):
     """Get list of supported preview types."""
-    return {
-        "supported_types": list(PREVIEWABLE_TYPES.keys()),
-        "max_file_size": settings.preview_max_file_size,
-        "enabled": settings.preview_enabled,
-    }
+    if request.headers.get("if-none-match") == _SUPPORTED_ETAG:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": _SUPPORTED_ETAG},
+        )
+
+    return Response(
+        content=_SUPPORTED_PAYLOAD,
+        media_type="application/json",
+        headers={"ETag": _SUPPORTED_ETAG},
+    )
 
 
 @router.get(
@@ -45,6 +201,7 @@ async def get_supported_types():
 )
 async def get_file_preview(
     file_id: uuid.UUID,
+    request: Request,
     thumbnail: bool = Query(False, description="Return thumbnail instead of full preview"),
     width: int = Query(200, ge=50, le=1000, description="Thumbnail width"),
     height: int = Query(200, ge=50, le=1000, description="Thumbnail height"),
@@ -52,23 +209,17 @@ async def get_file_preview(
     db: AsyncSession = Depends(get_db),
     preview_service: PreviewService = Depends(get_preview_service),
     storage_service: StorageService = Depends(get_storage_service),
+    preview_cache: Optional[PreviewCacheService] = Depends(get_preview_cache),
 ):
     """Get a preview for a file."""
-    if not settings.preview_enabled:
+    if not _PREVIEW_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Preview service is disabled",
         )
 
-    # Get file metadata
-    query = select(FileMetadata).where(
-        and_(
-            FileMetadata.id == file_id,
-            FileMetadata.is_deleted == False,
-        )
-    )
-    result = await db.execute(query)
-    file = result.scalar_one_or_none()
+    # Get file metadata together with its library's bucket name
+    file = await get_file_lookup(db, file_id)
 
     if not file:
         raise HTTPException(
@@ -84,29 +235,108 @@ async def get_file_preview(
         )
 
     # Check file size
-    if file.size_bytes and file.size_bytes > settings.preview_max_file_size:
+    if file.size_bytes and file.size_bytes > _PREVIEW_MAX_FILE_SIZE:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail="File too large for preview",
         )
 
-    # Get library to find the bucket name
-    library_result = await db.execute(
-        select(Library).where(Library.id == file.library_id)
-    )
-    library = library_result.scalar_one_or_none()
-    if not library:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Library not found",
+    # Skip download and rendering when the client already has this preview
+    etag = _preview_etag(file, thumbnail, width, height)
+    if request.headers.get("if-none-match") == etag:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={
+                "ETag": etag,
+                "Cache-Control": "private, max-age=3600",
+            },
         )
 
-    try:
-        # Get file content from storage
-        file_content = await storage_service.download_file(
-            bucket=library.bucket_name,
+    headers = {
+        "Content-Disposition": _inline_content_disposition(f"preview_{file.filename}"),
+        "Cache-Control": "private, max-age=3600",
+        "ETag": etag,
+    }
+
+    # Direct-render types need no processing for a full preview: stream the
+    # object from storage instead of buffering it in memory. The first chunk
+    # is pulled here so a missing object or storage error still maps to
+    # 404/500 before any response headers are sent.
+    if not thumbnail and not preview_service.needs_conversion(file.content_type):
+        chunks = storage_service.download_file_stream(
+            bucket=file.bucket_name,
             key=file.storage_key,
         )
+        try:
+            first_chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File content not found",
+            )
+        except Exception as e:
+            logger.error(
+                "preview_storage_error",
+                file_id=str(file_id),
+                error=str(e),
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Preview generation failed",
+            )
+
+        return StreamingResponse(
+            _prepend_chunk(first_chunk, chunks),
+            media_type=file.content_type,
+            headers=headers,
+        )
+
+    # The ETag covers file version and requested geometry, so it doubles
+    # as the server-side cache variant
+    cache_variant = etag.strip('"')
+
+    # For small sources, start the storage GET while Redis is checked so a
+    # cache miss doesn't pay both round-trips in sequence
+    download_task = None
+    if preview_cache is not None and (file.size_bytes or 0) <= _SPECULATIVE_DOWNLOAD_MAX_BYTES:
+        download_task = asyncio.create_task(
+            storage_service.download_file(
+                bucket=file.bucket_name,
+                key=file.storage_key,
+            )
+        )
+
+    if preview_cache is not None:
+        try:
+            cached = await preview_cache.get_preview(file.id, cache_variant)
+        except Exception as e:
+            # Treat an unreachable cache as a miss
+            logger.warning("preview_cache_read_error", file_id=str(file_id), error=str(e))
+            cached = None
+        if cached is not None:
+            if download_task is not None:
+                # Not awaited, so the cached response isn't held up; the
+                # callback swallows a download that already failed
+                download_task.add_done_callback(_discard_task_result)
+                download_task.cancel()
+            preview_content, preview_mime = cached
+            return Response(
+                content=preview_content,
+                media_type=preview_mime,
+                headers=headers,
+            )
+
+    try:
+        # Get file content from storage
+        if download_task is not None:
+            file_content = await download_task
+        else:
+            file_content = await storage_service.download_file(
+                bucket=file.bucket_name,
+                key=file.storage_key,
+            )
 
         if thumbnail:
             # Generate thumbnail
@@ -118,36 +348,44 @@ async def get_file_preview(
                 height=height,
             )
         else:
-            # Generate full preview
-            preview_content, preview_mime = await preview_service.generate_preview(
+            # Relay the converted document as Gotenberg produces it. Pull the
+            # first chunk here so conversion errors still map to 422/500
+            # before any response headers are sent.
+            chunks = preview_service.generate_preview_stream(
                 file_content=file_content,
                 file_name=file.filename,
                 mime_type=file.content_type,
             )
+            try:
+                first_chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                first_chunk = b""
 
-        # Encode filename for Content-Disposition header (RFC 5987)
-        from urllib.parse import quote
-
-        preview_filename = f"preview_{file.filename}"
-        # Create ASCII-safe fallback filename
-        ascii_filename = preview_filename.encode(
-            'ascii', 'replace'
-        ).decode('ascii').replace('?', '_')
-        # Create UTF-8 encoded filename for modern browsers
-        utf8_filename = quote(preview_filename, safe='')
+            return StreamingResponse(
+                _stream_and_cache(
+                    first_chunk,
+                    chunks,
+                    preview_cache,
+                    file.id,
+                    cache_variant,
+                ),
+                media_type="application/pdf",
+                headers=headers,
+            )
 
-        content_disp = (
-            f"inline; filename=\"{ascii_filename}\"; "
-            f"filename*=UTF-8''{utf8_filename}"
-        )
+        if preview_cache is not None:
+            await preview_cache.set_preview(
+                file.id,
+                preview_content,
+                preview_mime,
+                preview_type=cache_variant,
+                ttl=3600,
+            )
 
         return Response(
             content=preview_content,
             media_type=preview_mime,
-            headers={
-                "Content-Disposition": content_disp,
-                "Cache-Control": "private, max-age=3600",
-            },
+            headers=headers,
         )
 
     except ValueError as e:
@@ -179,15 +417,7 @@ async def check_preview_availability(
     preview_service: PreviewService = Depends(get_preview_service),
 ):
     """Check if preview is available for a file."""
-    # Get file metadata
-    query = select(FileMetadata).where(
-        and_(
-            FileMetadata.id == file_id,
-            FileMetadata.is_deleted == False,
-        )
-    )
-    result = await db.execute(query)
-    file = result.scalar_one_or_none()
+    file = await get_file_lookup(db, file_id)
 
     if not file:
         raise HTTPException(
@@ -195,18 +425,29 @@ async def check_preview_availability(
             detail="File not found",
         )
 
-    can_preview = preview_service.can_preview(file.content_type)
-    needs_conversion = preview_service.needs_conversion(file.content_type)
-    size_ok = (
-        not file.size_bytes or
-        file.size_bytes <= settings.preview_max_file_size
-    )
+    return _preview_availability(file, preview_service)
+
+
+@router.post(
+    "/check-batch",
+    summary="Check preview availability for several files",
+    description="Check if previews can be generated for up to 500 files in one request.",
+)
+async def check_preview_availability_batch(
+    data: PreviewCheckBatchRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    preview_service: PreviewService = Depends(get_preview_service),
+):
+    """Check preview availability for several files with a single lookup."""
+    files = await get_file_lookups(db, data.file_ids)
 
     return {
-        "file_id": str(file_id),
-        "mime_type": file.content_type,
-        "can_preview": can_preview and size_ok and settings.preview_enabled,
-        "needs_conversion": needs_conversion,
-        "size_ok": size_ok,
-        "service_enabled": settings.preview_enabled,
+        "results": [
+            _preview_availability(file, preview_service)
+            for file in files.values()
+        ],
+        "not_found": [
+            str(file_id) for file_id in data.file_ids if file_id not in files
+        ],
     }
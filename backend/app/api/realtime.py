@@ -1,36 +1,163 @@
 """API endpoints for real-time updates via SSE."""
 
 import asyncio
-import json
 import uuid
 from datetime import datetime, timezone
 from typing import Dict, Optional, Set
 
+import orjson
+import redis.asyncio as redis
 import structlog
 from fastapi import APIRouter, Depends, Query, Request
-from sse_starlette.sse import EventSourceResponse
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
 from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.security import UserContext
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/realtime", tags=["realtime"])
 
+# Interval between heartbeat events on idle and busy streams alike
+HEARTBEAT_INTERVAL_SECONDS = 30
+
 
-# In-memory event bus (for single-server deployment)
-# For production with multiple servers, use Redis Pub/Sub
 class EventBus:
-    """Simple in-memory event bus for real-time updates."""
+    """
+    Event bus for real-time updates.
+
+    Each SSE connection gets a local queue. When started with a Redis client,
+    publishes go through Redis Pub/Sub and a single pattern subscription per
+    process fans them out to local queues, so events reach subscribers on
+    every worker. Without Redis, events are delivered in-process only.
+    """
+
+    # Per-subscriber backlog; beyond this the oldest events are dropped so a
+    # slow client cannot grow server memory without bound
+    MAX_QUEUE_SIZE = 256
+
+    # Delay before resubscribing after a lost Redis subscription, doubled per
+    # failed attempt up to the maximum
+    RECONNECT_MIN_SECONDS = 1.0
+    RECONNECT_MAX_SECONDS = 30.0
 
     def __init__(self):
         self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
         self._user_subscriptions: Dict[str, Set[str]] = {}
 
+        # Queues that dropped events since their last heartbeat
+        self._slow_consumers: Set[asyncio.Queue] = set()
+        self.dropped_events = 0
+
+        # Redis Pub/Sub (set by start())
+        self._redis: Optional[redis.Redis] = None
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._channel_prefix = f"{settings.cache_prefix}realtime:"
+        self._user_prefix = f"{settings.cache_prefix}realtime-user:"
+
+    async def start(self, redis_client: redis.Redis) -> None:
+        """Start relaying events through Redis Pub/Sub."""
+        if self._listener_task is not None:
+            return
+
+        await self._subscribe(redis_client)
+        self._listener_task = asyncio.create_task(self._listen(redis_client))
+        logger.info("realtime_pubsub_started")
+
+    async def _subscribe(self, redis_client: redis.Redis) -> None:
+        """Open the pattern subscription and route publishes through Redis."""
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.psubscribe(
+                f"{self._channel_prefix}*",
+                f"{self._user_prefix}*",
+            )
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        self._pubsub = pubsub
+        self._redis = redis_client
+
+    async def _close_pubsub(self) -> None:
+        """Close the current subscription, if any."""
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except Exception as e:
+                logger.debug("realtime_pubsub_close_error", error=str(e))
+
+    async def stop(self) -> None:
+        """Stop relaying events through Redis Pub/Sub."""
+        self._redis = None
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        await self._close_pubsub()
+
+    async def _listen(self, redis_client: redis.Redis) -> None:
+        """Relay Redis Pub/Sub messages to local subscriber queues.
+
+        If the subscription is lost, publishes fall back to in-process
+        delivery while this resubscribes with exponential backoff.
+        """
+        delay = self.RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe(redis_client)
+                    logger.info("realtime_pubsub_reconnected")
+                delay = self.RECONNECT_MIN_SECONDS
+
+                async for message in self._pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._relay(message)
+                logger.warning("realtime_pubsub_closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("realtime_pubsub_error", error=str(e), retry_in=delay)
+
+            # Deliver in-process rather than publish into a subscription
+            # this process no longer hears
+            self._redis = None
+            await self._close_pubsub()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_SECONDS)
+
+    def _relay(self, message: dict) -> None:
+        """Deliver one Pub/Sub message; a bad message is logged and skipped."""
+        redis_channel = message["channel"]
+        try:
+            event = orjson.loads(message["data"])
+
+            if redis_channel.startswith(self._user_prefix):
+                user_id = redis_channel[len(self._user_prefix):]
+                for channel in list(self._user_subscriptions.get(user_id, ())):
+                    self._deliver(channel, event)
+            else:
+                self._deliver(
+                    redis_channel[len(self._channel_prefix):],
+                    event,
+                )
+        except Exception as e:
+            logger.warning(
+                "realtime_pubsub_message_error",
+                channel=redis_channel,
+                error=str(e),
+            )
+
     def subscribe(self, channel: str, user_id: str) -> asyncio.Queue:
         """Subscribe to a channel."""
         if channel not in self._subscribers:
             self._subscribers[channel] = set()
 
-        queue = asyncio.Queue()
+        queue = asyncio.Queue(maxsize=self.MAX_QUEUE_SIZE)
         self._subscribers[channel].add(queue)
 
         # Track user subscriptions
@@ -56,40 +183,87 @@ class EventBus:
         if user_id in self._user_subscriptions:
             self._user_subscriptions[user_id].discard(channel)
 
+        self._slow_consumers.discard(queue)
+
         logger.info(
             "realtime_unsubscribe",
             channel=channel,
             user_id=user_id,
         )
 
-    async def publish(self, channel: str, event_type: str, data: dict):
-        """Publish an event to a channel."""
-        if channel not in self._subscribers:
-            return
-
-        event = {
-            "type": event_type,
-            "data": data,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+    @staticmethod
+    def _make_event(event_type: str, data: dict) -> dict:
+        """Build an SSE message, serializing the payload once for all subscribers."""
+        return {
+            "event": event_type,
+            "data": orjson.dumps(data).decode(),
         }
 
-        for queue in self._subscribers[channel]:
+    def pop_slow_consumer(self, queue: asyncio.Queue) -> bool:
+        """Return whether a queue dropped events since the last call."""
+        if queue in self._slow_consumers:
+            self._slow_consumers.discard(queue)
+            return True
+        return False
+
+    def _deliver(self, channel: str, event: dict) -> None:
+        """Deliver an event to this process's subscribers of a channel.
+
+        Fan-out never awaits: each queue gets a non-blocking put, so one slow
+        subscriber cannot delay the others, and the subscriber set cannot
+        change while it is being iterated.
+        """
+        queues = self._subscribers.get(channel)
+        if not queues:
+            return
+
+        for queue in queues:
             try:
-                await queue.put(event)
-            except Exception as e:
-                logger.error(
-                    "realtime_publish_error",
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Drop the oldest event to make room for the newest
+                queue.get_nowait()
+                queue.put_nowait(event)
+                self._slow_consumers.add(queue)
+                self.dropped_events += 1
+                logger.warning(
+                    "realtime_dropped",
                     channel=channel,
-                    error=str(e),
+                    dropped_total=self.dropped_events,
                 )
 
+    async def publish(self, channel: str, event_type: str, data: dict):
+        """Publish an event to a channel."""
+        event = self._make_event(event_type, data)
+
+        if self._redis is not None:
+            try:
+                await self._redis.publish(
+                    f"{self._channel_prefix}{channel}",
+                    orjson.dumps(event),
+                )
+                return
+            except Exception as e:
+                logger.warning("realtime_redis_publish_error", channel=channel, error=str(e))
+
+        self._deliver(channel, event)
+
     async def publish_to_user(self, user_id: str, event_type: str, data: dict):
         """Publish an event to all channels a user is subscribed to."""
-        if user_id not in self._user_subscriptions:
-            return
+        event = self._make_event(event_type, data)
 
-        for channel in self._user_subscriptions[user_id]:
-            await self.publish(channel, event_type, data)
+        if self._redis is not None:
+            try:
+                await self._redis.publish(
+                    f"{self._user_prefix}{user_id}",
+                    orjson.dumps(event),
+                )
+                return
+            except Exception as e:
+                logger.warning("realtime_redis_publish_error", user_id=user_id, error=str(e))
+
+        for channel in list(self._user_subscriptions.get(user_id, ())):
+            self._deliver(channel, event)
 
 
 # Global event bus instance
@@ -142,10 +316,10 @@ class EventTypes:
 async def subscribe_to_events(
     request: Request,
     library_id: Optional[uuid.UUID] = Query(None, description="Subscribe to library events"),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Subscribe to real-time events via SSE."""
-    user_id = current_user["sub"]
+    user_id = str(current_user.user_id)
 
     # Determine channel
     if library_id:
@@ -161,40 +335,37 @@ async def subscribe_to_events(
             # Send initial connection event
             yield {
                 "event": "connected",
-                "data": json.dumps({
+                "data": orjson.dumps({
                     "channel": channel,
                     "user_id": user_id,
                     "timestamp": datetime.now(timezone.utc).isoformat(),
-                }),
+                }).decode(),
             }
 
+            # Disconnects cancel this generator; heartbeats come from the
+            # response's ping timer, so no per-iteration timeout is needed.
+            # Events are queued as ready-to-send SSE messages.
             while True:
-                # Check if client disconnected
-                if await request.is_disconnected():
-                    break
-
-                try:
-                    # Wait for events with timeout for heartbeat
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
-
-                    yield {
-                        "event": event["type"],
-                        "data": json.dumps(event["data"]),
-                    }
-
-                except asyncio.TimeoutError:
-                    # Send heartbeat
-                    yield {
-                        "event": "heartbeat",
-                        "data": json.dumps({
-                            "timestamp": datetime.now(timezone.utc).isoformat(),
-                        }),
-                    }
+                yield await queue.get()
 
         finally:
             event_bus.unsubscribe(channel, queue, user_id)
 
-    return EventSourceResponse(event_generator())
+    def heartbeat() -> ServerSentEvent:
+        """Build a heartbeat; slow_consumer tells the client it missed events."""
+        return ServerSentEvent(
+            event="heartbeat",
+            data=orjson.dumps({
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "slow_consumer": event_bus.pop_slow_consumer(queue),
+            }).decode(),
+        )
+
+    return EventSourceResponse(
+        event_generator(),
+        ping=HEARTBEAT_INTERVAL_SECONDS,
+        ping_message_factory=heartbeat,
+    )
 
 
 @router.post(
@@ -206,7 +377,7 @@ async def publish_event(
     channel: str,
     event_type: str,
     data: dict,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Publish an event to a channel.
 
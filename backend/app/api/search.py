@@ -12,17 +12,25 @@ from typing import List, Optional
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import BaseModel, Field
-from sqlalchemy import select
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_file_lookup
 from app.models import FileMetadata
-from app.services.search import SemanticSearchService, queue_file_for_indexing
+from app.services.search import (
+    SemanticSearchService,
+    queue_file_for_indexing,
+    queue_files_for_indexing,
+)
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/search", tags=["search"])
 
+# Rows fetched from the cursor and queued per batch when reindexing
+REINDEX_BATCH_SIZE = 1000
+
 
 class ChunkContext(BaseModel):
     """Context chunk information."""
@@ -73,6 +81,34 @@ class SearchResponse(BaseModel):
     filters_applied: dict = Field(default_factory=dict)
 
 
+class SearchBatchRequest(BaseModel):
+    """Several search queries sharing the same filters."""
+
+    queries: List[str] = Field(..., min_length=1, max_length=20)
+    library_id: Optional[uuid.UUID] = None
+    limit: int = Field(10, ge=1, le=50)
+    mime_type: Optional[str] = None
+    language: Optional[str] = None
+    chunk_type: Optional[str] = None
+    include_context: bool = False
+    group_by_file: bool = False
+
+    @field_validator("queries")
+    @classmethod
+    def validate_queries(cls, v: List[str]) -> List[str]:
+        """Apply the single-search query length limits to each query."""
+        for query in v:
+            if not 1 <= len(query) <= 500:
+                raise ValueError("Each query must be 1-500 characters")
+        return v
+
+
+class SearchBatchResponse(BaseModel):
+    """Batch search response, one entry per query in request order."""
+
+    responses: List[SearchResponse]
+
+
 class IndexStatusResponse(BaseModel):
     """Index status response."""
 
@@ -82,6 +118,57 @@ class IndexStatusResponse(BaseModel):
     language: Optional[str] = None
 
 
+def _filters_applied(
+    library_id: Optional[uuid.UUID],
+    mime_type: Optional[str],
+    language: Optional[str],
+    chunk_type: Optional[str],
+    include_context: bool,
+    group_by_file: bool,
+) -> dict:
+    """Build the filters applied dict for a search response."""
+    filters_applied = {}
+    if library_id:
+        filters_applied["library_id"] = str(library_id)
+    if mime_type:
+        filters_applied["mime_type"] = mime_type
+    if language:
+        filters_applied["language"] = language
+    if chunk_type:
+        filters_applied["chunk_type"] = chunk_type
+    if include_context:
+        filters_applied["include_context"] = True
+    if group_by_file:
+        filters_applied["group_by_file"] = True
+    return filters_applied
+
+
+def _search_result_dict(r: dict) -> dict:
+    """Shape a search service hit like SearchResult, without model validation."""
+    return {
+        "file_id": r["file_id"],
+        "file_name": r["file_name"],
+        "library_id": r["library_id"],
+        "path": r.get("path"),
+        "mime_type": r["mime_type"],
+        "size": r["size"],
+        "relevance_score": r["relevance_score"],
+        "snippet": r["snippet"],
+        "chunk_index": r.get("chunk_index", 0),
+        "chunk_type": r.get("chunk_type", "full"),
+        "language": r.get("language"),
+        "name": r.get("name"),
+        "line_start": r.get("line_start"),
+        "line_end": r.get("line_end"),
+        "heading": r.get("heading"),
+        "docstring": r.get("docstring"),
+        "imports": r.get("imports"),
+        "frameworks": r.get("frameworks"),
+        # Context chunks come back from the service already in ChunkContext shape
+        "context": r.get("context") or None,
+    }
+
+
 def get_search_service(
     db: AsyncSession = Depends(get_db),
 ) -> SemanticSearchService:
@@ -92,6 +179,7 @@ def get_search_service(
 @router.get(
     "",
     response_model=SearchResponse,
+    response_class=ORJSONResponse,
     summary="Semantic search",
     description="""Search for files using semantic similarity.
 
@@ -142,59 +230,20 @@ async def semantic_search(
             group_by_file=group_by_file,
         )
 
-        # Build filters applied dict
-        filters_applied = {}
-        if library_id:
-            filters_applied["library_id"] = str(library_id)
-        if mime_type:
-            filters_applied["mime_type"] = mime_type
-        if language:
-            filters_applied["language"] = language
-        if chunk_type:
-            filters_applied["chunk_type"] = chunk_type
-        if include_context:
-            filters_applied["include_context"] = True
-        if group_by_file:
-            filters_applied["group_by_file"] = True
-
-        # Convert results to response model
-        search_results = []
-        for r in results:
-            # Handle context if present
-            context = None
-            if r.get("context"):
-                context = [ChunkContext(**c) for c in r["context"]]
-
-            search_results.append(
-                SearchResult(
-                    file_id=r["file_id"],
-                    file_name=r["file_name"],
-                    library_id=r["library_id"],
-                    path=r.get("path"),
-                    mime_type=r["mime_type"],
-                    size=r["size"],
-                    relevance_score=r["relevance_score"],
-                    snippet=r["snippet"],
-                    chunk_index=r.get("chunk_index", 0),
-                    chunk_type=r.get("chunk_type", "full"),
-                    language=r.get("language"),
-                    name=r.get("name"),
-                    line_start=r.get("line_start"),
-                    line_end=r.get("line_end"),
-                    heading=r.get("heading"),
-                    docstring=r.get("docstring"),
-                    imports=r.get("imports"),
-                    frameworks=r.get("frameworks"),
-                    context=context,
-                )
-            )
-
-        return SearchResponse(
-            query=q,
-            results=search_results,
-            total=len(search_results),
-            filters_applied=filters_applied,
+        filters_applied = _filters_applied(
+            library_id, mime_type, language, chunk_type, include_context, group_by_file
         )
+
+        # Results are already plain dicts; shape them to SearchResult and
+        # serialize with orjson instead of validating a model per result
+        search_results = [_search_result_dict(r) for r in results]
+
+        return ORJSONResponse({
+            "query": q,
+            "results": search_results,
+            "total": len(search_results),
+            "filters_applied": filters_applied,
+        })
     except Exception as e:
         logger.error("search_error", query=q, error=str(e))
         raise HTTPException(
@@ -203,6 +252,59 @@ async def semantic_search(
         )
 
 
+@router.post(
+    "/batch",
+    response_model=SearchBatchResponse,
+    response_class=ORJSONResponse,
+    summary="Batch semantic search",
+    description="Run up to 20 semantic searches with the same filters in one request.",
+)
+async def semantic_search_batch(
+    data: SearchBatchRequest,
+    current_user: dict = Depends(get_current_user),
+    service: SemanticSearchService = Depends(get_search_service),
+):
+    """Search for files with several queries at once."""
+    try:
+        results_per_query = await service.search_batch(
+            queries=data.queries,
+            library_id=data.library_id,
+            limit=data.limit,
+            mime_type_filter=data.mime_type,
+            language_filter=data.language,
+            chunk_type_filter=data.chunk_type,
+            include_context=data.include_context,
+            group_by_file=data.group_by_file,
+        )
+
+        filters_applied = _filters_applied(
+            data.library_id,
+            data.mime_type,
+            data.language,
+            data.chunk_type,
+            data.include_context,
+            data.group_by_file,
+        )
+
+        responses = []
+        for query, results in zip(data.queries, results_per_query):
+            search_results = [_search_result_dict(r) for r in results]
+            responses.append({
+                "query": query,
+                "results": search_results,
+                "total": len(search_results),
+                "filters_applied": filters_applied,
+            })
+
+        return ORJSONResponse({"responses": responses})
+    except Exception as e:
+        logger.error("search_batch_error", queries=len(data.queries), error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Search failed",
+        )
+
+
 @router.get(
     "/languages",
     summary="List supported languages",
@@ -278,10 +380,7 @@ async def index_file(
 ):
     """Manually trigger indexing for a file."""
     # Verify file exists
-    result = await db.execute(
-        select(FileMetadata).where(FileMetadata.id == file_id)
-    )
-    file = result.scalar_one_or_none()
+    file = await get_file_lookup(db, file_id)
 
     if not file:
         raise HTTPException(
@@ -289,7 +388,7 @@ async def index_file(
             detail="File not found",
         )
 
-    await queue_file_for_indexing(file.id, file.library_id)
+    await queue_file_for_indexing(file.id, file.library_id, force=True)
 
     return {
         "message": "Indexing queued",
@@ -327,30 +426,26 @@ async def reindex_files(
     db: AsyncSession = Depends(get_db),
 ):
     """Queue files for re-indexing in the background."""
-    # Build query
-    query = select(FileMetadata).where(FileMetadata.is_deleted.is_(False))
+    # Filter in SQL and only fetch the ids the queue needs
+    query = select(FileMetadata.id, FileMetadata.library_id).where(
+        FileMetadata.is_deleted.is_(False)
+    )
 
     if library_id:
         query = query.where(FileMetadata.library_id == library_id)
-
-    result = await db.execute(query)
-    files = result.scalars().all()
-
-    # Filter by language if specified
     if language:
-        from app.services.chunking import chunking_service
-
-        filtered_files = []
-        for file in files:
-            detected_lang = chunking_service.detect_language(file.filename)
-            if detected_lang.value == language:
-                filtered_files.append(file)
-        files = filtered_files
+        query = query.where(FileMetadata.language == language)
 
+    # Stream rows through a server-side cursor so memory stays flat, and
+    # hand them to the indexing queue a batch at a time
     queued_count = 0
-    for file in files:
-        await queue_file_for_indexing(file.id, file.library_id)
-        queued_count += 1
+    result = await db.stream(query.execution_options(yield_per=REINDEX_BATCH_SIZE))
+    async for batch in result.partitions():
+        queued = await queue_files_for_indexing(batch, force=True)
+        queued_count += queued
+        if queued < len(batch):
+            # Queue is full; no point reading the rest
+            break
 
     logger.info(
         "reindex_queued",
@@ -380,25 +475,24 @@ async def get_index_stats(
     db: AsyncSession = Depends(get_db),
 ):
     """Get search index statistics."""
-    # Count files
-    query = select(FileMetadata).where(FileMetadata.is_deleted.is_(False))
+    # Count by language in a single grouped query
+    query = (
+        select(FileMetadata.language, func.count())
+        .where(FileMetadata.is_deleted.is_(False))
+        .group_by(FileMetadata.language)
+    )
     if library_id:
         query = query.where(FileMetadata.library_id == library_id)
 
     result = await db.execute(query)
-    files = result.scalars().all()
-
-    # Count by language
-    from app.services.chunking import chunking_service
 
     language_counts = {}
-    for file in files:
-        lang = chunking_service.detect_language(file.filename)
-        lang_name = lang.value
-        language_counts[lang_name] = language_counts.get(lang_name, 0) + 1
+    for lang_name, count in result.all():
+        lang_name = lang_name or "unknown"
+        language_counts[lang_name] = language_counts.get(lang_name, 0) + count
 
     return {
-        "total_files": len(files),
+        "total_files": sum(language_counts.values()),
         "by_language": language_counts,
         "library_id": str(library_id) if library_id else None,
     }
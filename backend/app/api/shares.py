@@ -1,14 +1,20 @@
 """API endpoints for share links."""
 
+import hashlib
 import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
+import orjson
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
 from app.core.config import settings
+from app.core.security import UserContext
 from app.schemas.share import (
     GuestAccountCreate,
     GuestAccountResponse,
@@ -21,11 +27,16 @@ from app.schemas.share import (
     ShareStatistics,
     ShareTargetType,
 )
+from app.services.cache import LocalTTLCache
 from app.services.share import KeycloakGuestService, ShareService
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/shares", tags=["shares"])
 
+# Public share info by token. Expiry is evaluated on read, so entries only
+# go stale on revoke/update/delete, which evict them on this worker.
+_public_share_cache = LocalTTLCache(ttl_seconds=30, max_size=10_000)
+
 
 def get_share_service(
     db: AsyncSession = Depends(get_db),
@@ -35,13 +46,14 @@ def get_share_service(
     return ShareService(db=db, base_url=base_url)
 
 
+@lru_cache(maxsize=1)
 def get_guest_service() -> KeycloakGuestService:
-    """Get Keycloak guest service dependency."""
+    """Get the shared Keycloak guest service (it caches the admin token)."""
     return KeycloakGuestService(
-        keycloak_url=settings.KEYCLOAK_URL,
-        realm=settings.KEYCLOAK_REALM,
-        client_id=settings.KEYCLOAK_CLIENT_ID,
-        client_secret=settings.KEYCLOAK_CLIENT_SECRET,
+        keycloak_url=settings.keycloak_url,
+        realm=settings.keycloak_realm,
+        client_id=settings.keycloak_client_id,
+        client_secret=settings.keycloak_client_secret,
     )
 
 
@@ -59,14 +71,14 @@ def get_guest_service() -> KeycloakGuestService:
 )
 async def create_share_link(
     data: ShareLinkCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """Create a new share link."""
     try:
         share = await service.create_share_link(
             data=data,
-            user_id=uuid.UUID(current_user["sub"]),
+            user_id=current_user.user_id,
         )
         return share
     except ValueError as e:
@@ -79,63 +91,69 @@ async def create_share_link(
 @router.get(
     "",
     response_model=list[ShareLinkResponse],
+    response_class=ORJSONResponse,
     summary="List my share links",
     description="List all share links created by the current user.",
 )
 async def list_my_shares(
     include_expired: bool = Query(False, description="Include expired shares"),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """List all share links created by the current user."""
-    return await service.list_user_shares(
-        user_id=uuid.UUID(current_user["sub"]),
+    shares = await service.list_user_shares(
+        user_id=current_user.user_id,
         include_expired=include_expired,
     )
+    # Already validated by the service; orjson encodes UUIDs and datetimes
+    return ORJSONResponse([share.model_dump() for share in shares])
 
 
 @router.get(
     "/resource/{target_type}/{target_id}",
     response_model=list[ShareLinkResponse],
+    response_class=ORJSONResponse,
     summary="List shares for a resource",
     description="List all share links for a specific file, directory, or library.",
 )
 async def list_shares_for_resource(
     target_type: ShareTargetType,
     target_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """List all share links for a specific resource."""
-    return await service.list_shares_for_resource(
+    shares = await service.list_shares_for_resource(
         target_type=target_type,
         target_id=target_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
+    return ORJSONResponse([share.model_dump() for share in shares])
 
 
 @router.get(
     "/{share_id}",
     response_model=ShareLinkResponse,
+    response_class=ORJSONResponse,
     summary="Get share link details",
     description="Get details of a specific share link.",
 )
 async def get_share_link(
     share_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """Get a share link by ID."""
     share = await service.get_share_link(
         share_id=share_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
     if not share:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Share link not found",
         )
-    return share
+    return ORJSONResponse(share.model_dump())
 
 
 @router.patch(
@@ -147,20 +165,21 @@ async def get_share_link(
 async def update_share_link(
     share_id: uuid.UUID,
     data: ShareLinkUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """Update a share link."""
     share = await service.update_share_link(
         share_id=share_id,
         data=data,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
     if not share:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Share link not found",
         )
+    _public_share_cache.delete(share.token)
     return share
 
 
@@ -172,19 +191,20 @@ async def update_share_link(
 )
 async def revoke_share_link(
     share_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """Revoke a share link."""
-    success = await service.revoke_share_link(
+    token = await service.revoke_share_link(
         share_id=share_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
-    if not success:
+    if token is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Share link not found",
         )
+    _public_share_cache.delete(token)
 
 
 @router.delete(
@@ -195,19 +215,20 @@ async def revoke_share_link(
 )
 async def delete_share_link(
     share_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """Delete a share link."""
-    success = await service.delete_share_link(
+    token = await service.delete_share_link(
         share_id=share_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
-    if not success:
+    if token is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Share link not found",
         )
+    _public_share_cache.delete(token)
 
 
 @router.get(
@@ -218,13 +239,13 @@ async def delete_share_link(
 )
 async def get_share_statistics(
     share_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: ShareService = Depends(get_share_service),
 ):
     """Get statistics for a share link."""
     stats = await service.get_share_statistics(
         share_id=share_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
     if not stats:
         raise HTTPException(
@@ -248,7 +269,7 @@ async def get_share_statistics(
 )
 async def create_guest_account(
     data: GuestAccountCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     guest_service: KeycloakGuestService = Depends(get_guest_service),
 ):
     """Create a guest account for share access."""
@@ -274,40 +295,52 @@ async def create_guest_account(
 )
 async def get_public_share_info(
     token: str,
+    request: Request,
     service: ShareService = Depends(get_share_service),
 ):
     """Get public information about a share link."""
-    share_link = await service.get_share_by_token(token)
-
-    if not share_link:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Share link not found or has been revoked",
+    cached = _public_share_cache.get(token)
+    if cached is None:
+        row = await service.get_share_with_target_by_token(token)
+
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Share link not found or has been revoked",
+            )
+
+        share_link, target_name = row
+        cached = (
+            {
+                "id": share_link.id,
+                "share_type": share_link.share_type,
+                "target_type": share_link.target_type,
+                "target_name": target_name or "Shared Resource",
+                "password_protected": share_link.password_hash is not None,
+                "allow_guest_access": share_link.allow_guest_access,
+            },
+            share_link.expires_at,
         )
+        _public_share_cache.set(token, cached)
 
-    # Get target name
-    target = await service._get_target(
-        ShareTargetType(share_link.target_type),
-        share_link.target_id,
+    fields, expires_at = cached
+    info = ShareLinkPublicResponse(
+        **fields,
+        is_expired=expires_at is not None and expires_at < datetime.now(timezone.utc),
     )
-    target_name = getattr(target, "name", "Shared Resource")
-
-    import datetime
 
-    is_expired = (
-        share_link.expires_at is not None
-        and share_link.expires_at < datetime.datetime.now(datetime.timezone.utc)
-    )
+    # The ETag covers the whole body, so it changes on expiry as well as on
+    # updates. max-age matches the server-side cache so revokes show up
+    # within the same window.
+    payload = orjson.dumps(info.model_dump())
+    headers = {
+        "ETag": f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"',
+        "Cache-Control": "public, max-age=30",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return ShareLinkPublicResponse(
-        id=share_link.id,
-        share_type=share_link.share_type,
-        target_type=share_link.target_type,
-        target_name=target_name,
-        password_protected=share_link.password_hash is not None,
-        allow_guest_access=share_link.allow_guest_access,
-        is_expired=is_expired,
-    )
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.post(
@@ -327,7 +360,9 @@ async def access_share(
     visitor_ip = request.client.host if request.client else None
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
-        visitor_ip = forwarded_for.split(",")[0].strip()
+        first_hop = forwarded_for.partition(",")[0].strip()
+        if first_hop:
+            visitor_ip = first_hop
 
     try:
         return await service.access_share(
@@ -5,9 +5,11 @@ from typing import Optional
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.core.security import UserContext
 from app.schemas.trash import (
     EmptyTrashResponse,
     PermanentDeleteRequest,
@@ -17,7 +19,7 @@ from app.schemas.trash import (
     TrashListResponse,
 )
 from app.services.audit import AuditService
-from app.services.storage import StorageService
+from app.services.storage import StorageService, get_storage_service
 from app.services.trash import TrashService
 
 logger = structlog.get_logger(__name__)
@@ -29,29 +31,38 @@ def get_trash_service(
 ) -> TrashService:
     """Get trash service dependency."""
     audit_service = AuditService(db=db)
-    return TrashService(db=db, audit=audit_service)
+    return TrashService(db=db, storage=get_storage_service(), audit=audit_service)
 
 
 @router.get(
     "",
     response_model=TrashListResponse,
+    response_class=ORJSONResponse,
     summary="List trash items",
     description="Get all items in the trash/recycle bin.",
 )
 async def list_trash_items(
     library_id: Optional[uuid.UUID] = Query(None, description="Filter by library"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of items"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    current_user: dict = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: UserContext = Depends(get_current_user),
     service: TrashService = Depends(get_trash_service),
 ):
-    """List all items in trash."""
-    return await service.get_trash_items(
-        library_id=library_id,
-        user_id=uuid.UUID(current_user["sub"]),
-        limit=limit,
-        offset=offset,
-    )
+    """List items in trash, one page at a time."""
+    try:
+        trash = await service.get_trash_items(
+            library_id=library_id,
+            user_id=current_user.user_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    # Already validated by the service; orjson encodes UUIDs and datetimes
+    return ORJSONResponse(trash.model_dump())
 
 
 @router.post(
@@ -62,14 +73,14 @@ async def list_trash_items(
 )
 async def restore_item(
     request: RestoreRequest,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: TrashService = Depends(get_trash_service),
 ):
     """Restore an item from trash."""
     try:
         return await service.restore_item(
             request=request,
-            user_id=uuid.UUID(current_user["sub"]),
+            user_id=current_user.user_id,
         )
     except ValueError as e:
         raise HTTPException(
@@ -87,14 +98,14 @@ async def restore_item(
 async def permanent_delete_item(
     item_type: TrashItemType,
     item_id: uuid.UUID,
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: TrashService = Depends(get_trash_service),
 ):
     """Permanently delete an item from trash."""
     success = await service.permanent_delete(
         item_type=item_type,
         item_id=item_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
     if not success:
         raise HTTPException(
@@ -111,11 +122,11 @@ async def permanent_delete_item(
 )
 async def empty_trash(
     library_id: Optional[uuid.UUID] = Query(None, description="Empty trash for specific library"),
-    current_user: dict = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     service: TrashService = Depends(get_trash_service),
 ):
     """Empty all items from trash."""
     return await service.empty_trash(
         library_id=library_id,
-        user_id=uuid.UUID(current_user["sub"]),
+        user_id=current_user.user_id,
     )
@@ -0,0 +1,76 @@
+"""Response compression middleware."""
+
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Media types worth compressing; everything else (file downloads, images,
+# PDFs, already-encoded bodies) is passed through untouched
+_COMPRESSIBLE_TYPES = frozenset({
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"image/svg+xml",
+})
+_COMPRESSIBLE_SUFFIXES = (b"+json", b"+xml")
+# text/* is compressible, except SSE: gzip would hold back small events
+_UNCOMPRESSIBLE_TEXT_TYPES = frozenset({b"text/event-stream"})
+
+
+def _is_compressible(headers) -> bool:
+    """Check raw response headers for a compressible, not yet encoded body."""
+    media_type = b""
+    for key, value in headers:
+        if key == b"content-encoding":
+            return False
+        if key == b"content-type":
+            media_type = value.split(b";", 1)[0].strip().lower()
+
+    if media_type.startswith(b"text/"):
+        return media_type not in _UNCOMPRESSIBLE_TEXT_TYPES
+    return media_type in _COMPRESSIBLE_TYPES or media_type.endswith(
+        _COMPRESSIBLE_SUFFIXES
+    )
+
+
+class _CompressibleGZipResponder(GZipResponder):
+    """GZipResponder that only compresses JSON and other text bodies."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 9) -> None:
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.passthrough = not _is_compressible(message.get("headers", ()))
+        if self.passthrough:
+            await self.send(message)
+            return
+        await super().send_with_gzip(message)
+
+
+class CompressibleGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that only compresses JSON and other text responses.
+
+    Starlette's GZipMiddleware (before 0.41) compresses every response over
+    minimum_size. That includes streamed file downloads, images and PDFs,
+    which gain nothing and lose Content-Length, and SSE streams, where the
+    gzip buffer holds back small events such as heartbeats. The decision is
+    made per response from its Content-Type, and bodies that already carry
+    a Content-Encoding are left alone.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            for key, value in scope["headers"]:
+                if key == b"accept-encoding":
+                    if b"gzip" in value:
+                        responder = _CompressibleGZipResponder(
+                            self.app,
+                            self.minimum_size,
+                            compresslevel=self.compresslevel,
+                        )
+                        await responder(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
@@ -1,21 +1,28 @@
 """Application configuration using Pydantic Settings."""
 
-from functools import lru_cache
+import os
+from functools import cached_property, lru_cache
 from typing import List, Optional
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Production gets its configuration from real environment variables, so
+# don't look for (and parse) a .env file there
+_ENV_FILE: Optional[str] = None if os.getenv("ENV", "").lower() == "prod" else ".env"
+
 
 class Settings(BaseSettings):
     """
     Application settings loaded from environment variables.
 
-    All settings can be overridden via environment variables.
+    All settings can be overridden via environment variables. Derived URLs
+    are built on first access and cached, since settings don't change after
+    startup.
     """
 
     model_config = SettingsConfigDict(
-        env_file=".env",
+        env_file=_ENV_FILE,
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
@@ -55,11 +62,15 @@ class Settings(BaseSettings):
     postgres_db: str = Field(default="beacon_library", description="PostgreSQL database name")
 
     # Connection pool settings
-    db_pool_size: int = Field(default=5, description="Database connection pool size")
+    db_pool_size: int = Field(default=20, description="Database connection pool size")
     db_max_overflow: int = Field(default=10, description="Max overflow connections")
     db_pool_timeout: int = Field(default=30, description="Pool timeout in seconds")
+    db_statement_cache_size: int = Field(
+        default=1024,
+        description="Prepared statements cached per connection (asyncpg)",
+    )
 
-    @property
+    @cached_property
     def database_url(self) -> str:
         """Construct the async database URL."""
         return (
@@ -67,7 +78,7 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
-    @property
+    @cached_property
     def database_url_sync(self) -> str:
         """Construct the sync database URL (for Alembic)."""
         return (
@@ -87,7 +98,7 @@ class Settings(BaseSettings):
     cache_ttl_seconds: int = Field(default=300, description="Default cache TTL in seconds")
     cache_prefix: str = Field(default="beacon:", description="Cache key prefix")
 
-    @property
+    @cached_property
     def redis_url(self) -> str:
         """Construct the Redis URL."""
         auth = f":{self.redis_password}@" if self.redis_password else ""
@@ -117,7 +128,7 @@ class Settings(BaseSettings):
         description="Presigned URL expiry in seconds",
     )
 
-    @property
+    @cached_property
     def minio_endpoint_url(self) -> str:
         """Construct the MinIO endpoint URL."""
         protocol = "https" if self.minio_secure else "http"
@@ -160,21 +171,26 @@ class Settings(BaseSettings):
         description="Enable authentication (set to False for development)",
     )
 
-    @property
+    @cached_property
     def keycloak_issuer(self) -> str:
         """Construct the Keycloak issuer URL."""
         return f"{self.keycloak_url}/realms/{self.keycloak_realm}"
 
-    @property
+    @cached_property
     def keycloak_jwks_url(self) -> str:
         """Construct the Keycloak JWKS URL."""
         return f"{self.keycloak_issuer}/protocol/openid-connect/certs"
 
-    @property
+    @cached_property
     def keycloak_token_url(self) -> str:
         """Construct the Keycloak token endpoint URL."""
         return f"{self.keycloak_issuer}/protocol/openid-connect/token"
 
+    @cached_property
+    def keycloak_effective_audience(self) -> str:
+        """JWT audience to verify (keycloak_audience, else the client ID)."""
+        return self.keycloak_audience or self.keycloak_client_id
+
     # ==========================================================================
     # MCP Server
     # ==========================================================================
@@ -205,12 +221,25 @@ class Settings(BaseSettings):
         description="Ollama embedding model",
     )
 
-    @property
+    search_cache_ttl: int = Field(
+        default=300,
+        description="Seconds a cached search result is reused (0 disables the cache)",
+    )
+    search_cache_similarity: float = Field(
+        default=0.95,
+        description="Minimum cosine similarity for a query to reuse cached results",
+    )
+    search_cache_max_entries: int = Field(
+        default=1024,
+        description="Maximum number of cached search results per process",
+    )
+
+    @cached_property
     def chromadb_url(self) -> str:
         """Construct the ChromaDB URL."""
         return f"http://{self.chromadb_host}:{self.chromadb_port}"
 
-    @property
+    @cached_property
     def ollama_url(self) -> str:
         """Construct the Ollama URL."""
         return f"http://{self.ollama_host}:{self.ollama_port}"
@@ -325,7 +354,12 @@ class Settings(BaseSettings):
 
 @lru_cache
 def get_settings() -> Settings:
-    """Get cached settings instance."""
+    """
+    Get cached settings instance.
+
+    Call get_settings.cache_clear() to rebuild it after changing the
+    environment (e.g. in tests).
+    """
     return Settings()
 
 
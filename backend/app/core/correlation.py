@@ -1,18 +1,39 @@
 """Correlation ID middleware for request tracing."""
 
+import os
 import uuid
 from contextvars import ContextVar
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Context variable to store correlation ID across async boundaries
 correlation_id_var: ContextVar[Optional[uuid.UUID]] = ContextVar(
     "correlation_id", default=None
 )
 
+# Random v4 UUIDs generated in batches, so minting a correlation ID doesn't
+# cost a getrandom() call per request
+_UUID_BATCH_SIZE = 256
+_uuid_pool: List[uuid.UUID] = []
+
+
+def _next_uuid() -> uuid.UUID:
+    """Get a new random (version 4) UUID from the pool."""
+    if not _uuid_pool:
+        raw = os.urandom(16 * _UUID_BATCH_SIZE)
+        _uuid_pool.extend(
+            uuid.UUID(bytes=raw[i : i + 16], version=4)
+            for i in range(0, len(raw), 16)
+        )
+    return _uuid_pool.pop()
+
+
+# Forked workers must not hand out the parent's remaining UUIDs
+os.register_at_fork(after_in_child=_uuid_pool.clear)
+
 
 def get_correlation_id() -> uuid.UUID:
     """Get the current correlation ID from context.
@@ -21,7 +42,7 @@ def get_correlation_id() -> uuid.UUID:
     """
     cid = correlation_id_var.get()
     if cid is None:
-        cid = uuid.uuid4()
+        cid = _next_uuid()
         correlation_id_var.set(cid)
     return cid
 
@@ -31,7 +52,7 @@ def set_correlation_id(correlation_id: uuid.UUID) -> None:
     correlation_id_var.set(correlation_id)
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+class CorrelationIdMiddleware:
     """Middleware to extract or generate correlation ID for each request.
 
     The correlation ID is:
@@ -39,39 +60,53 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
     2. Generated as a new UUID if not present
     3. Set in the context for use throughout the request
     4. Added to the response headers
+
+    Written as plain ASGI middleware: it only reads one request header and
+    adds one response header, so it skips BaseHTTPMiddleware's per-request
+    task group and response streaming.
     """
 
     HEADER_NAME = "X-Correlation-ID"
+    _HEADER_KEY = HEADER_NAME.lower().encode("latin-1")
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        # Extract or generate correlation ID
-        correlation_id_header = request.headers.get(self.HEADER_NAME)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        if correlation_id_header:
-            try:
-                correlation_id = uuid.UUID(correlation_id_header)
-            except ValueError:
-                # Invalid UUID format, generate new one
-                correlation_id = uuid.uuid4()
-        else:
-            correlation_id = uuid.uuid4()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Extract or generate correlation ID
+        correlation_id = None
+        header_value = None
+        for key, value in scope["headers"]:
+            if key == self._HEADER_KEY:
+                header_value = value.decode("latin-1")
+                try:
+                    correlation_id = uuid.UUID(header_value)
+                except ValueError:
+                    # Invalid UUID format, generate new one
+                    pass
+                break
+
+        if correlation_id is None:
+            correlation_id = _next_uuid()
+            header_value = str(correlation_id)
+
+        # Store in request state for easy access
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+
+        async def send_with_correlation_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Echo the client's header as-is rather than re-formatting it
+                MutableHeaders(scope=message)[self.HEADER_NAME] = header_value
+            await send(message)
 
         # Set in context
         token = correlation_id_var.set(correlation_id)
-
         try:
-            # Store in request state for easy access
-            request.state.correlation_id = correlation_id
-
-            # Process request
-            response = await call_next(request)
-
-            # Add correlation ID to response headers
-            response.headers[self.HEADER_NAME] = str(correlation_id)
-
-            return response
+            await self.app(scope, receive, send_with_correlation_id)
         finally:
             # Reset context
             correlation_id_var.reset(token)
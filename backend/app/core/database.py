@@ -20,6 +20,10 @@ engine: AsyncEngine = create_async_engine(
     pool_timeout=settings.db_pool_timeout,
     pool_pre_ping=True,
     echo=settings.debug,
+    # Reuse prepared statements across requests on each pooled connection
+    connect_args={
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    },
 )
 
 # Create session factory
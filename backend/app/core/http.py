@@ -0,0 +1,40 @@
+"""Shared outbound HTTP client."""
+
+import importlib.util
+from typing import Optional
+
+import httpx
+
+# HTTP/2 needs the optional h2 package; without it the client speaks HTTP/1.1
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide outbound HTTP client.
+
+    Reusing one client keeps connections (and TLS sessions) to Keycloak and
+    Ollama alive across requests. Per-call timeouts can still be passed to
+    individual requests.
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its connection pool."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -1,84 +1,141 @@
 """Security utilities for Keycloak authentication and authorization."""
 
+import asyncio
+import base64
+import hashlib
+import logging
+import time
 import uuid
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
 from functools import lru_cache
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Collection, Dict, FrozenSet, Optional, Set
 
-import httpx
+import orjson
 import structlog
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from jose.exceptions import ExpiredSignatureError
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import ExpiredSignatureError, JWKError
 
 from app.core.config import settings
+from app.core.correlation import get_request_correlation_id
+from app.core.http import get_http_client
+from app.services.cache import LocalTTLCache
 
 logger = structlog.get_logger(__name__)
 
 # HTTP Bearer scheme for token extraction
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# Well-known roles get a bit each so common role checks are a single AND;
+# any other role falls back to set operations
+_ROLE_BITS: Dict[str, int] = {
+    "library-admin": 1 << 0,
+    "library-user": 1 << 1,
+    "guest": 1 << 2,
+}
+_ADMIN_BIT = _ROLE_BITS["library-admin"]
+_USER_BITS = _ROLE_BITS["library-admin"] | _ROLE_BITS["library-user"]
 
-@dataclass
+
+def _role_bits(roles: Collection[str]) -> int:
+    """Pack the well-known roles in a role set into a bitmask."""
+    bits = 0
+    for role in roles:
+        bits |= _ROLE_BITS.get(role, 0)
+    return bits
+
+
+def _role_mask(roles: Collection[str]) -> Optional[int]:
+    """Bitmask for a set of required roles, or None if any isn't well-known."""
+    if not all(role in _ROLE_BITS for role in roles):
+        return None
+    return _role_bits(roles)
+
+
+@dataclass(slots=True)
 class UserContext:
     """
     Authenticated user context extracted from JWT token.
 
-    Contains user identity and authorization information.
+    Contains user identity and authorization information. Roles are frozen
+    and the well-known ones packed into role_bits once, since role checks
+    run on most requests.
     """
     user_id: uuid.UUID
     username: str
     email: Optional[str]
     name: Optional[str]
-    roles: Set[str]
-    groups: Set[str]
+    roles: FrozenSet[str]
+    groups: FrozenSet[str]
     token: str
     token_exp: datetime
     is_guest: bool = False
 
     # Request context
-    correlation_id: uuid.UUID = None
+    correlation_id: Optional[uuid.UUID] = None
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
 
+    # Derived from roles
+    role_bits: int = field(init=False)
+    is_admin: bool = field(init=False)
+    is_user: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.role_bits = _role_bits(self.roles)
+        self.is_admin = bool(self.role_bits & _ADMIN_BIT)
+        self.is_user = bool(self.role_bits & _USER_BITS)
+
     def has_role(self, role: str) -> bool:
         """Check if user has a specific role."""
         return role in self.roles
 
-    def has_any_role(self, roles: List[str]) -> bool:
+    def has_any_role(self, roles: Collection[str]) -> bool:
         """Check if user has any of the specified roles."""
-        return bool(self.roles & set(roles))
+        mask = _role_mask(roles)
+        if mask is None:
+            return not self.roles.isdisjoint(roles)
+        return bool(self.role_bits & mask)
 
-    def has_all_roles(self, roles: List[str]) -> bool:
+    def has_all_roles(self, roles: Collection[str]) -> bool:
         """Check if user has all specified roles."""
-        return set(roles) <= self.roles
-
-    @property
-    def is_admin(self) -> bool:
-        """Check if user is a library admin."""
-        return "library-admin" in self.roles
-
-    @property
-    def is_user(self) -> bool:
-        """Check if user is a regular library user."""
-        return "library-user" in self.roles or self.is_admin
+        mask = _role_mask(roles)
+        if mask is None:
+            return self.roles.issuperset(roles)
+        return self.role_bits & mask == mask
 
 
 class KeycloakJWKS:
     """
     Keycloak JWKS (JSON Web Key Set) manager.
 
-    Fetches and caches public keys for JWT verification.
+    Fetches and caches public keys for JWT verification. Keys are built
+    into verification key objects once per fetch, so token verification
+    doesn't re-parse the JWK on every request.
     """
 
     def __init__(self):
-        self._keys: Dict[str, Any] = {}
-        self._last_fetch: Optional[datetime] = None
+        self._keys: Dict[str, Key] = {}
+        # time.monotonic() deadline after which the cached keys are stale
+        self._deadline: float = 0.0
         self._cache_ttl = 3600  # 1 hour
-
-    async def get_public_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        self._refresh_lock = asyncio.Lock()
+        # monotonic time of the last fetch attempt, successful or not
+        self._last_fetch: float = float("-inf")
+        # After a failed fetch, stale keys are served this long before the
+        # next attempt, so an outage costs one slow fetch per window rather
+        # than one per queued request
+        self._retry_backoff = 30
+
+        # Unknown key IDs -> monotonic time until which they aren't looked up again
+        self._missing_kids: Dict[str, float] = {}
+        self._missing_ttl = 60
+        self._missing_max_entries = 1024
+
+    async def get_public_key(self, kid: str) -> Optional[Key]:
         """
         Get a public key by key ID.
 
@@ -86,47 +143,91 @@ class KeycloakJWKS:
             kid: Key ID from JWT header
 
         Returns:
-            JWK dict or None if not found
+            Verification key or None if not found
         """
-        # Refresh if cache is stale or key not found
-        if self._should_refresh() or kid not in self._keys:
-            await self._fetch_keys()
+        if self._keys and not self._should_refresh():
+            key = self._keys.get(kid)
+            if key is not None or not self._may_refresh_for(kid):
+                return key
+
+        # Refresh if cache is stale or key not found; only one request
+        # fetches while the others wait for its result
+        async with self._refresh_lock:
+            if self._should_refresh() or (
+                kid not in self._keys and self._may_refresh_for(kid)
+            ):
+                await self._fetch_keys()
+
+            key = self._keys.get(kid)
+            if key is None:
+                self._remember_missing(kid)
+
+        if not self._keys:
+            # Never fetched successfully; still backing off
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service unavailable",
+            )
 
-        return self._keys.get(kid)
+        return key
 
     def _should_refresh(self) -> bool:
         """Check if keys should be refreshed."""
-        if self._last_fetch is None:
-            return True
-        elapsed = (datetime.utcnow() - self._last_fetch).total_seconds()
-        return elapsed > self._cache_ttl
+        return time.monotonic() >= self._deadline
+
+    def _may_refresh_for(self, kid: str) -> bool:
+        """
+        Check if an unknown key ID justifies fetching the key set early.
+
+        Rotated keys show up as unknown IDs before the cache expires, but
+        tokens with made-up IDs must not turn into a Keycloak round-trip
+        each, so early fetches happen at most once per missing-key TTL.
+        """
+        now = time.monotonic()
+        if self._missing_kids.get(kid, 0.0) > now:
+            return False
+        return now >= self._last_fetch + self._missing_ttl
+
+    def _remember_missing(self, kid: str) -> None:
+        """Record a key ID that isn't in the current key set."""
+        now = time.monotonic()
+        if len(self._missing_kids) >= self._missing_max_entries:
+            self._missing_kids = {
+                k: until for k, until in self._missing_kids.items() if until > now
+            }
+            if len(self._missing_kids) >= self._missing_max_entries:
+                self._missing_kids.clear()
+        self._missing_kids[kid] = now + self._missing_ttl
 
     async def _fetch_keys(self) -> None:
         """Fetch JWKS from Keycloak."""
+        self._last_fetch = time.monotonic()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    settings.keycloak_jwks_url,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                jwks = response.json()
-
-                self._keys = {
-                    key["kid"]: key
-                    for key in jwks.get("keys", [])
-                }
-                self._last_fetch = datetime.utcnow()
-                logger.debug("jwks_fetched", key_count=len(self._keys))
+            response = await get_http_client().get(
+                settings.keycloak_jwks_url,
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            jwks = response.json()
+
+            keys: Dict[str, Key] = {}
+            for key in jwks.get("keys", []):
+                try:
+                    keys[key["kid"]] = jwk.construct(key, algorithm="RS256")
+                except (JWKError, KeyError) as e:
+                    # e.g. encryption keys published alongside signing keys
+                    logger.debug("jwks_key_skipped", kid=key.get("kid"), error=str(e))
+
+            self._keys = keys
+            self._deadline = time.monotonic() + self._cache_ttl
+            self._missing_kids.clear()
+            logger.debug("jwks_fetched", key_count=len(self._keys))
 
         except Exception as e:
             logger.error("jwks_fetch_failed", error=str(e))
-            # Keep existing keys on error
-            if not self._keys:
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail="Authentication service unavailable",
-                )
+            # Keep existing keys on error, and don't retry until the backoff
+            # has passed
+            self._deadline = time.monotonic() + self._retry_backoff
 
 
 # Singleton JWKS manager
@@ -141,6 +242,32 @@ def get_jwks_manager() -> KeycloakJWKS:
     return _jwks_manager
 
 
+def _get_token_kid(token: str) -> Optional[str]:
+    """
+    Read the key ID from a JWT header without verifying the token.
+
+    jwt.decode parses the header again, so this only decodes the header
+    segment rather than going through jwt.get_unverified_header.
+
+    Raises:
+        JWTError: If the header segment is malformed
+    """
+    segment = token.split(".", 1)[0]
+    segment += "=" * (-len(segment) % 4)
+    try:
+        header = orjson.loads(base64.urlsafe_b64decode(segment))
+    except ValueError:
+        raise JWTError("Error decoding token headers.")
+    if not isinstance(header, dict):
+        raise JWTError("Invalid header string: must be a json object")
+    return header.get("kid")
+
+
+# Payloads of recently verified tokens, keyed by a hash of the token.
+# Bounded so a flood of distinct valid tokens can't grow it without limit.
+_verified_tokens = LocalTTLCache(ttl_seconds=60, max_size=10_000)
+
+
 async def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode and verify a JWT token.
@@ -154,10 +281,18 @@ async def decode_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    # Clients resend the same token on every request; skip the RSA verify
+    # for one that already passed, as long as it hasn't expired since
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _verified_tokens.get(cache_key)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        _verified_tokens.delete(cache_key)
+
     try:
         # Decode header to get key ID
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
+        kid = _get_token_kid(token)
 
         if not kid:
             raise HTTPException(
@@ -176,13 +311,11 @@ async def decode_token(token: str) -> Dict[str, Any]:
             )
 
         # Verify and decode
-        audience = settings.keycloak_audience or settings.keycloak_client_id
-
         payload = jwt.decode(
             token,
             key,
             algorithms=["RS256"],
-            audience=audience,
+            audience=settings.keycloak_effective_audience,
             issuer=settings.keycloak_issuer,
             options={
                 "verify_signature": settings.keycloak_verify_token,
@@ -192,6 +325,7 @@ async def decode_token(token: str) -> Dict[str, Any]:
             },
         )
 
+        _verified_tokens.set(cache_key, payload)
         return payload
 
     except ExpiredSignatureError:
@@ -252,17 +386,17 @@ def extract_user_context(
     roles.update(client_access.get("roles", []))
 
     # Extract groups
-    groups: Set[str] = set(payload.get("groups", []))
+    groups = frozenset(payload.get("groups", []))
 
     # Token expiry
     exp_timestamp = payload.get("exp", 0)
-    token_exp = datetime.utcfromtimestamp(exp_timestamp)
+    token_exp = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
 
     # Check if guest account
     is_guest = "guest" in roles or payload.get("azp") == settings.keycloak_guest_client_id
 
-    # Generate correlation ID
-    correlation_id = uuid.uuid4()
+    # Reuse the request's correlation ID so auth logs line up with the rest
+    correlation_id = get_request_correlation_id(request)
 
     # Extract client info
     ip_address = request.client.host if request.client else None
@@ -273,7 +407,7 @@ def extract_user_context(
         username=payload.get("preferred_username", ""),
         email=payload.get("email"),
         name=payload.get("name"),
-        roles=roles,
+        roles=frozenset(roles),
         groups=groups,
         token=token,
         token_exp=token_exp,
@@ -284,6 +418,31 @@ def extract_user_context(
     )
 
 
+# Mock admin user for development, used when authentication is disabled.
+# The startup log warns about it once instead of every request.
+_DEV_USER = UserContext(
+    user_id=uuid.UUID("00000000-0000-0000-0000-000000000001"),
+    username="dev-user",
+    email="dev@example.com",
+    name="Development User",
+    roles=frozenset({"library-admin", "library-user"}),
+    groups=frozenset(),
+    token="dev-token",
+    token_exp=datetime.max.replace(tzinfo=timezone.utc),
+    is_guest=False,
+)
+
+
+def _get_dev_user(request: Request) -> UserContext:
+    """Get the development user with this request's client details."""
+    return replace(
+        _DEV_USER,
+        correlation_id=get_request_correlation_id(request),
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent"),
+    )
+
+
 async def get_current_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
@@ -298,23 +457,8 @@ async def get_current_user(
     """
     # Check if authentication is disabled (development mode)
     if not settings.enable_auth:
-        # Create a mock admin user for development
-        logger.warning("authentication_disabled", message="Running with authentication disabled - DEVELOPMENT ONLY")
-        return UserContext(
-            user_id=uuid.UUID("00000000-0000-0000-0000-000000000001"),
-            username="dev-user",
-            email="dev@example.com",
-            name="Development User",
-            roles={"library-admin", "library-user"},
-            groups=set(),
-            token="dev-token",
-            token_exp=datetime.utcnow(),
-            is_guest=False,
-            correlation_id=uuid.uuid4(),
-            ip_address=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent"),
-        )
-    
+        return _get_dev_user(request)
+
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -326,12 +470,15 @@ async def get_current_user(
     payload = await decode_token(token)
     user = extract_user_context(payload, token, request)
 
-    logger.debug(
-        "user_authenticated",
-        user_id=str(user.user_id),
-        username=user.username,
-        roles=list(user.roles),
-    )
+    # Runs on every authenticated request; skip building the log fields
+    # unless debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "user_authenticated",
+            user_id=str(user.user_id),
+            username=user.username,
+            roles=list(user.roles),
+        )
 
     return user
 
@@ -345,6 +492,9 @@ async def get_current_user_optional(
 
     Returns None if no valid authentication is provided.
     """
+    if not settings.enable_auth:
+        return _get_dev_user(request)
+
     if credentials is None:
         return None
 
@@ -358,19 +508,38 @@ def require_roles(*required_roles: str):
     """
     Dependency factory to require specific roles.
 
+    Routes requiring the same set of roles (in any order) share one
+    dependency, so FastAPI resolves it once per request.
+
     Usage:
         @app.get("/admin")
         async def admin_route(user: UserContext = Depends(require_roles("library-admin"))):
             ...
     """
+    return _role_checker(frozenset(required_roles))
+
+
+@lru_cache(maxsize=None)
+def _role_checker(required: FrozenSet[str]):
+    """Build the role-check dependency for a set of roles."""
+    mask = _role_mask(required)
+    names = sorted(required)
+    detail = f"Required roles: {', '.join(names)}"
+
     async def role_checker(user: UserContext = Depends(get_current_user)) -> UserContext:
-        if not user.has_any_role(list(required_roles)):
+        if mask is not None:
+            allowed = bool(user.role_bits & mask)
+        else:
+            allowed = not user.roles.isdisjoint(required)
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Required roles: {', '.join(required_roles)}",
+                detail=detail,
             )
         return user
 
+    # Stable, readable name for the dependency graph and tracebacks
+    role_checker.__name__ = role_checker.__qualname__ = f"role_checker[{','.join(names)}]"
     return role_checker
 
 
@@ -1,12 +1,12 @@
 """API versioning middleware using Accept header."""
 
-import re
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
 
 import structlog
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 
@@ -16,17 +16,37 @@ logger = structlog.get_logger(__name__)
 SUPPORTED_VERSIONS = {"v1"}
 DEFAULT_VERSION = "v1"
 
-# Accept header pattern: application/vnd.beacon.v1+json
-VERSION_PATTERN = re.compile(
-    r"application/vnd\.beacon\.(?P<version>v\d+)\+json",
-    re.IGNORECASE,
-)
+# Response media type per supported version, built once
+_MEDIA_TYPES = {
+    version: f"application/vnd.beacon.{version}+json"
+    for version in SUPPORTED_VERSIONS
+}
 
+# Raw (Content-Type, X-API-Version) response headers per supported version
+_RESPONSE_HEADERS = {
+    version: (
+        (b"content-type", media_type.encode("latin-1")),
+        (b"x-api-version", version.encode("latin-1")),
+    )
+    for version, media_type in _MEDIA_TYPES.items()
+}
+_PASSTHROUGH_CONTENT_TYPES = (b"text/event-stream", b"text/plain")
 
+# Versioned media type: application/vnd.beacon.v1+json
+_MEDIA_TYPE_PREFIX = "application/vnd.beacon.v"
+_MEDIA_TYPE_SUFFIX = "+json"
+
+_NO_VERSION: Tuple[Optional[str], Optional[str]] = (None, None)
+
+
+@lru_cache(maxsize=512)
 def parse_accept_header(accept: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Parse the Accept header to extract API version.
 
+    Clients send only a handful of distinct Accept values, so results are
+    cached by the raw header.
+
     Args:
         accept: Accept header value
 
@@ -34,46 +54,78 @@ def parse_accept_header(accept: str) -> Tuple[Optional[str], Optional[str]]:
         Tuple of (version, media_type) or (None, None) if not found
     """
     if not accept:
-        return None, None
-
-    # Check for versioned media type
-    match = VERSION_PATTERN.search(accept)
-    if match:
-        version = match.group("version").lower()
-        return version, f"application/vnd.beacon.{version}+json"
-
-    return None, None
+        return _NO_VERSION
+
+    # Check for versioned media type (case-insensitive)
+    accept = accept.lower()
+    start = accept.find(_MEDIA_TYPE_PREFIX)
+    while start >= 0:
+        digits_start = end = start + len(_MEDIA_TYPE_PREFIX)
+        while end < len(accept) and "0" <= accept[end] <= "9":
+            end += 1
+        if end > digits_start and accept.startswith(_MEDIA_TYPE_SUFFIX, end):
+            version = "v" + accept[digits_start:end]
+            return version, f"application/vnd.beacon.{version}+json"
+        start = accept.find(_MEDIA_TYPE_PREFIX, start + 1)
+
+    return _NO_VERSION
+
+
+@lru_cache(maxsize=512)
+def _parse_raw_accept_header(accept: bytes) -> Tuple[Optional[str], Optional[str]]:
+    """parse_accept_header for a raw ASGI header value, cached by the bytes."""
+    if not accept:
+        return _NO_VERSION
+    return parse_accept_header(accept.decode("latin-1"))
 
 
-class APIVersionMiddleware(BaseHTTPMiddleware):
+class APIVersionMiddleware:
     """
     Middleware to handle API versioning via Accept header.
 
     Extracts version from Accept header and sets it in request state.
     Adds Content-Type header with version to response.
+
+    Written as plain ASGI middleware since it runs on every API request and
+    only touches headers; BaseHTTPMiddleware would add a task group and
+    response streaming per request.
+
+    Args:
+        app: The wrapped ASGI application
+        exclude_paths: Exact paths under the API prefix that aren't versioned
+            API endpoints (docs, OpenAPI schema, health checks)
     """
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
-        # Skip versioning for non-API routes
-        if not request.url.path.startswith(settings.api_prefix):
-            return await call_next(request)
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = ()) -> None:
+        self.app = app
+        self.prefix = settings.api_prefix
+        self.exclude_paths = frozenset(exclude_paths)
 
-        # Parse Accept header
-        accept = request.headers.get("Accept", "")
-        version, media_type = parse_accept_header(accept)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip versioning for non-API routes
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.prefix)
+            or scope["path"] in self.exclude_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Parse Accept header (raw bytes, so repeat values skip decoding)
+        accept = b""
+        for key, value in scope["headers"]:
+            if key == b"accept":
+                accept = value
+                break
+        version, _ = _parse_raw_accept_header(accept)
 
         # Use default version if not specified
         if version is None:
             version = DEFAULT_VERSION
-            media_type = f"application/vnd.beacon.{version}+json"
 
         # Check if version is supported
         if version not in SUPPORTED_VERSIONS:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=406,
                 content={
                     "error": "Not Acceptable",
@@ -81,23 +133,37 @@ class APIVersionMiddleware(BaseHTTPMiddleware):
                     "supported_versions": list(SUPPORTED_VERSIONS),
                 },
             )
+            await response(scope, receive, send)
+            return
 
         # Store version in request state
-        request.state.api_version = version
-
-        # Process request
-        response = await call_next(request)
-
-        # Add version to response Content-Type
-        # But preserve original content type for SSE and streaming responses
-        if response.status_code < 400:
-            original_content_type = response.headers.get("Content-Type", "")
-            # Don't override SSE or streaming content types
-            if not original_content_type.startswith(("text/event-stream", "text/plain")):
-                response.headers["Content-Type"] = media_type
-            response.headers["X-API-Version"] = version
-
-        return response
+        scope.setdefault("state", {})["api_version"] = version
+
+        content_type_header, version_header = _RESPONSE_HEADERS[version]
+
+        async def send_with_version(message: Message) -> None:
+            # Add version to response Content-Type
+            # But preserve original content type for SSE and streaming responses
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                # Rebuild the header list in one pass instead of two
+                # MutableHeaders updates
+                headers = []
+                keep_content_type = False
+                for key, value in message.get("headers", ()):
+                    if key == b"content-type":
+                        # Don't override SSE or streaming content types
+                        if value.startswith(_PASSTHROUGH_CONTENT_TYPES):
+                            keep_content_type = True
+                            headers.append((key, value))
+                    elif key != b"x-api-version":
+                        headers.append((key, value))
+                if not keep_content_type:
+                    headers.append(content_type_header)
+                headers.append(version_header)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
 
 
 def get_api_version(request: Request) -> str:
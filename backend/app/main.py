@@ -7,13 +7,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
+from app.api.realtime import event_bus
+from app.core.compression import CompressibleGZipMiddleware
 from app.core.config import settings
 from app.core.correlation import CorrelationIdMiddleware
 from app.core.database import async_session_factory, close_db, init_db
+from app.core.http import close_http_client
 from app.core.versioning import APIVersionMiddleware
 from app.observability import instrument_app
 from app.services.cache import close_cache_service, get_cache_service
 from app.services.search import start_indexing_worker, stop_indexing_worker
+from app.services.share import start_access_log_writer, stop_access_log_writer
 from app.services.storage import get_storage_service
 
 logger = structlog.get_logger(__name__)
@@ -25,6 +29,12 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("application_starting", env=settings.env)
 
+    if not settings.enable_auth:
+        logger.warning(
+            "authentication_disabled",
+            message="Running with authentication disabled - DEVELOPMENT ONLY",
+        )
+
     # Initialize database
     try:
         await init_db()
@@ -34,26 +44,48 @@ async def lifespan(app: FastAPI):
 
     # Initialize cache
     try:
-        await get_cache_service()
+        cache_service = await get_cache_service()
         logger.info("cache_connected")
     except Exception as e:
+        cache_service = None
         logger.warning("cache_connection_failed", error=str(e))
 
+    # Relay real-time events across workers through Redis Pub/Sub
+    if cache_service is not None:
+        try:
+            await event_bus.start(cache_service.client)
+        except Exception as e:
+            logger.warning("realtime_pubsub_failed", error=str(e))
+
+    # Open the shared storage client so the first request skips client setup
+    storage_service = get_storage_service()
+    try:
+        await storage_service.connect()
+        logger.info("storage_connected")
+    except Exception as e:
+        logger.warning("storage_connection_failed", error=str(e))
+
     # Start search indexing worker
     try:
-        storage_service = get_storage_service()
         await start_indexing_worker(async_session_factory, storage_service)
         logger.info("search_indexing_worker_started")
     except Exception as e:
         logger.warning("search_indexing_worker_failed", error=str(e))
 
+    # Buffer share access audit rows off the request path
+    await start_access_log_writer(async_session_factory)
+
     yield
 
     # Shutdown
     logger.info("application_shutting_down")
     await stop_indexing_worker()
+    await stop_access_log_writer(async_session_factory)
+    await event_bus.stop()
+    await storage_service.close()
     await close_db()
     await close_cache_service()
+    await close_http_client()
 
 
 app = FastAPI(
@@ -72,8 +104,16 @@ instrument_app(app)
 # Correlation ID middleware (for request tracing)
 app.add_middleware(CorrelationIdMiddleware)
 
-# API versioning middleware
-app.add_middleware(APIVersionMiddleware)
+# Compress JSON bodies of 1 KB and up (added before versioning so the
+# versioning middleware's headers are set on the compressed response)
+app.add_middleware(CompressibleGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# API versioning middleware (docs, schema and health live under the API
+# prefix but aren't versioned endpoints)
+app.add_middleware(
+    APIVersionMiddleware,
+    exclude_paths=[app.docs_url, app.redoc_url, app.openapi_url, "/api/health"],
+)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -4,11 +4,24 @@ Supports both stdio and SSE transports for AI agent access.
 """
 
 import asyncio
-import json
+import copy
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Dict, List, Optional
+from collections import deque
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
 
+import orjson
 import structlog
 from fastapi import Request, Response
 from mcp.server import Server
@@ -27,6 +40,16 @@ from app.core.config import settings
 logger = structlog.get_logger(__name__)
 
 
+# orjson handles datetimes, UUIDs and dataclasses natively; anything else
+# (e.g. paths) falls back to str()
+_TOOL_RESULT_JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dump_tool_result(result: Any) -> str:
+    """Serialize an MCP tool result to JSON text."""
+    return orjson.dumps(result, default=str, option=_TOOL_RESULT_JSON_OPTIONS).decode()
+
+
 class RateLimitConfig(BaseModel):
     """Rate limit configuration for MCP agents."""
 
@@ -39,39 +62,58 @@ class RateLimiter:
 
     def __init__(self, config: RateLimitConfig):
         self.config = config
-        self._requests: Dict[str, List[datetime]] = {}
+        # Request times per agent (time.monotonic()), oldest first
+        self._requests: Dict[str, Deque[float]] = {}
+        self._last_sweep = time.monotonic()
 
     def is_allowed(self, agent_id: str) -> bool:
         """Check if an agent is allowed to make a request."""
-        now = datetime.now(timezone.utc)
-        window_start = now - timedelta(seconds=self.config.window_seconds)
-
-        # Clean old requests
-        if agent_id in self._requests:
-            self._requests[agent_id] = [
-                ts for ts in self._requests[agent_id] if ts > window_start
-            ]
+        now = time.monotonic()
+        window_start = now - self.config.window_seconds
+
+        # Agent IDs are client-supplied, so drop idle ones every so often
+        if now - self._last_sweep > self.config.window_seconds * 10:
+            self._sweep(window_start)
+            self._last_sweep = now
+
+        requests = self._requests.get(agent_id)
+        if requests is None:
+            requests = self._requests[agent_id] = deque()
         else:
-            self._requests[agent_id] = []
+            # Clean old requests
+            while requests and requests[0] <= window_start:
+                requests.popleft()
 
         # Check limit
-        if len(self._requests[agent_id]) >= self.config.requests_per_minute:
+        if len(requests) >= self.config.requests_per_minute:
             return False
 
         # Record request
-        self._requests[agent_id].append(now)
+        requests.append(now)
         return True
 
     def get_remaining(self, agent_id: str) -> int:
         """Get remaining requests for an agent."""
-        now = datetime.now(timezone.utc)
-        window_start = now - timedelta(seconds=self.config.window_seconds)
+        now = time.monotonic()
+        window_start = now - self.config.window_seconds
 
-        if agent_id not in self._requests:
+        requests = self._requests.get(agent_id)
+        if requests is None:
             return self.config.requests_per_minute
 
-        recent = [ts for ts in self._requests[agent_id] if ts > window_start]
-        return max(0, self.config.requests_per_minute - len(recent))
+        while requests and requests[0] <= window_start:
+            requests.popleft()
+        return max(0, self.config.requests_per_minute - len(requests))
+
+    def _sweep(self, window_start: float) -> None:
+        """Forget agents with no requests inside the current window."""
+        idle = [
+            agent_id
+            for agent_id, requests in self._requests.items()
+            if not requests or requests[-1] <= window_start
+        ]
+        for agent_id in idle:
+            del self._requests[agent_id]
 
 
 class LibraryPolicy:
@@ -82,12 +124,15 @@ class LibraryPolicy:
         library_id: uuid.UUID,
         read_enabled: bool = True,
         write_enabled: bool = False,
-        allowed_agents: Optional[List[str]] = None,
+        allowed_agents: Optional[Iterable[str]] = None,
     ):
         self.library_id = library_id
         self.read_enabled = read_enabled
         self.write_enabled = write_enabled
-        self.allowed_agents = allowed_agents  # None means all agents allowed
+        # None means all agents allowed; a set keeps the per-call check O(1)
+        self.allowed_agents: Optional[FrozenSet[str]] = (
+            frozenset(allowed_agents) if allowed_agents is not None else None
+        )
 
     def can_read(self, agent_id: str) -> bool:
         """Check if agent can read from library."""
@@ -106,6 +151,121 @@ class LibraryPolicy:
         return True
 
 
+# Tool definitions, shared by the MCP protocol handlers and the JSON-RPC
+# tools/list endpoint. They're static, so they're built once at import.
+_TOOL_SCHEMAS: Dict[str, dict] = {
+    "list_libraries": {
+        "name": "list_libraries",
+        "description": "List all available document libraries",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+        },
+    },
+    "browse_library": {
+        "name": "browse_library",
+        "description": "Browse contents of a library or directory",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "library_id": {
+                    "type": "string",
+                    "description": "UUID of the library",
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Path within the library (default: /)",
+                    "default": "/",
+                },
+            },
+            "required": ["library_id"],
+        },
+    },
+    "read_file": {
+        "name": "read_file",
+        "description": "Read the contents of a file",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "file_id": {
+                    "type": "string",
+                    "description": "UUID of the file to read",
+                },
+            },
+            "required": ["file_id"],
+        },
+    },
+    "search_files": {
+        "name": "search_files",
+        "description": "Search for files by name or content",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query",
+                },
+                "library_id": {
+                    "type": "string",
+                    "description": "Limit search to specific library (optional)",
+                },
+            },
+            "required": ["query"],
+        },
+    },
+    "create_file": {
+        "name": "create_file",
+        "description": "Create a new file in a library (requires write permission)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "library_id": {
+                    "type": "string",
+                    "description": "UUID of the library",
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Path for the new file",
+                },
+                "content": {
+                    "type": "string",
+                    "description": "File content",
+                },
+            },
+            "required": ["library_id", "path", "content"],
+        },
+    },
+    "update_file": {
+        "name": "update_file",
+        "description": "Update an existing file (requires write permission)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "file_id": {
+                    "type": "string",
+                    "description": "UUID of the file to update",
+                },
+                "content": {
+                    "type": "string",
+                    "description": "New file content",
+                },
+            },
+            "required": ["file_id", "content"],
+        },
+    },
+}
+
+_TOOLS: List[Tool] = [Tool(**schema) for schema in _TOOL_SCHEMAS.values()]
+
+# Constant parts of the SSE event payloads; only the variable values are
+# formatted per event
+_CONNECTED_PREFIX = '{"server": "beacon-library", "version": "1.0.0", "agent_id": '
+_HEARTBEAT_PREFIX = '{"timestamp": "'
+_HEARTBEAT_SUFFIX = '"}'
+
+HEARTBEAT_INTERVAL_SECONDS = 30
+
+
 class MCPServer:
     """MCP Server for Beacon Library.
 
@@ -134,6 +294,10 @@ class MCPServer:
         self._tools: Dict[str, Callable] = {}
         self._server = Server("beacon-library")
 
+        # One timer feeds heartbeats to every open SSE connection
+        self._heartbeat_subscribers: Set[asyncio.Queue] = set()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
         # Register handlers
         self._setup_handlers()
 
@@ -143,108 +307,7 @@ class MCPServer:
         @self._server.list_tools()
         async def list_tools() -> list[Tool]:
             """List available tools."""
-            tools = [
-                Tool(
-                    name="list_libraries",
-                    description="List all available document libraries",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                    },
-                ),
-                Tool(
-                    name="browse_library",
-                    description="Browse contents of a library or directory",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "library_id": {
-                                "type": "string",
-                                "description": "UUID of the library",
-                            },
-                            "path": {
-                                "type": "string",
-                                "description": "Path within the library (optional)",
-                                "default": "/",
-                            },
-                        },
-                        "required": ["library_id"],
-                    },
-                ),
-                Tool(
-                    name="read_file",
-                    description="Read the contents of a file",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "file_id": {
-                                "type": "string",
-                                "description": "UUID of the file to read",
-                            },
-                        },
-                        "required": ["file_id"],
-                    },
-                ),
-                Tool(
-                    name="search_files",
-                    description="Search for files by name or content",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search query",
-                            },
-                            "library_id": {
-                                "type": "string",
-                                "description": "Limit search to specific library (optional)",
-                            },
-                        },
-                        "required": ["query"],
-                    },
-                ),
-                Tool(
-                    name="create_file",
-                    description="Create a new file in a library (requires write permission)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "library_id": {
-                                "type": "string",
-                                "description": "UUID of the library",
-                            },
-                            "path": {
-                                "type": "string",
-                                "description": "Path for the new file",
-                            },
-                            "content": {
-                                "type": "string",
-                                "description": "File content",
-                            },
-                        },
-                        "required": ["library_id", "path", "content"],
-                    },
-                ),
-                Tool(
-                    name="update_file",
-                    description="Update an existing file (requires write permission)",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "file_id": {
-                                "type": "string",
-                                "description": "UUID of the file to update",
-                            },
-                            "content": {
-                                "type": "string",
-                                "description": "New file content",
-                            },
-                        },
-                        "required": ["file_id", "content"],
-                    },
-                ),
-            ]
-            return tools
+            return _TOOLS
 
         @self._server.call_tool()
         async def call_tool(name: str, arguments: dict):
@@ -254,7 +317,7 @@ class MCPServer:
                     result = await self._tools[name](arguments)
                     # IMPORTANT: mcp.server.Server.call_tool expects an Iterable[Content],
                     # not a CallToolResult. The server wrapper will construct CallToolResult.
-                    return [TextContent(type="text", text=json.dumps(result))]
+                    return [TextContent(type="text", text=dump_tool_result(result))]
                 else:
                     # Raise so the MCP server wrapper marks isError=True
                     raise ValueError(f"Unknown tool: {name}")
@@ -268,111 +331,15 @@ class MCPServer:
         self._tools[name] = handler
 
     def get_tool_schema(self, name: str) -> dict:
-        """Get the schema for a tool in MCP format."""
-        # Tool schemas for the standard MCP protocol
-        schemas = {
-            "list_libraries": {
-                "name": "list_libraries",
-                "description": "List all available libraries in Beacon Library",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "required": [],
-                },
-            },
-            "browse_library": {
-                "name": "browse_library",
-                "description": "Browse contents of a library or directory",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "library_id": {
-                            "type": "string",
-                            "description": "UUID of the library to browse",
-                        },
-                        "path": {
-                            "type": "string",
-                            "description": "Path within the library (default: /)",
-                            "default": "/",
-                        },
-                    },
-                    "required": ["library_id"],
-                },
-            },
-            "read_file": {
-                "name": "read_file",
-                "description": "Read the contents of a text file",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "file_id": {
-                            "type": "string",
-                            "description": "UUID of the file to read",
-                        },
-                    },
-                    "required": ["file_id"],
-                },
-            },
-            "search_files": {
-                "name": "search_files",
-                "description": "Search for files by name",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Search query string",
-                        },
-                        "library_id": {
-                            "type": "string",
-                            "description": "Optional: limit search to specific library",
-                        },
-                    },
-                    "required": ["query"],
-                },
-            },
-            "create_file": {
-                "name": "create_file",
-                "description": "Create a new text file in a library",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "library_id": {
-                            "type": "string",
-                            "description": "UUID of the library",
-                        },
-                        "path": {
-                            "type": "string",
-                            "description": "Full path for the new file",
-                        },
-                        "content": {
-                            "type": "string",
-                            "description": "Content of the file",
-                        },
-                    },
-                    "required": ["library_id", "path", "content"],
-                },
-            },
-            "update_file": {
-                "name": "update_file",
-                "description": "Update an existing file",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "file_id": {
-                            "type": "string",
-                            "description": "UUID of the file to update",
-                        },
-                        "content": {
-                            "type": "string",
-                            "description": "New content for the file",
-                        },
-                    },
-                    "required": ["file_id", "content"],
-                },
-            },
-        }
-        return schemas.get(name, {"name": name, "description": "Unknown tool", "inputSchema": {"type": "object"}})
+        """Get the schema for a tool in MCP format.
+
+        Returns a copy, so callers may modify it without touching the shared
+        definitions.
+        """
+        schema = _TOOL_SCHEMAS.get(name)
+        if schema is None:
+            return {"name": name, "description": "Unknown tool", "inputSchema": {"type": "object"}}
+        return copy.deepcopy(schema)
 
     def set_library_policy(self, policy: LibraryPolicy):
         """Set access policy for a library."""
@@ -380,10 +347,12 @@ class MCPServer:
 
     def get_library_policy(self, library_id: uuid.UUID) -> LibraryPolicy:
         """Get access policy for a library."""
-        if library_id in self._library_policies:
-            return self._library_policies[library_id]
+        policy = self._library_policies.get(library_id)
+        if policy is not None:
+            return policy
 
-        # Default policy: read-only, based on settings
+        # Default policy: read-only, based on settings. Not stored, since
+        # library_id comes from agent tool arguments and isn't known to exist.
         return LibraryPolicy(
             library_id=library_id,
             read_enabled=True,
@@ -420,35 +389,57 @@ class MCPServer:
             async def rate_limit_error():
                 yield {
                     "event": "error",
-                    "data": json.dumps({
+                    "data": orjson.dumps({
                         "error": "Rate limit exceeded",
                         "remaining": self.rate_limiter.get_remaining(agent_id),
-                    }),
+                    }).decode(),
                 }
             return EventSourceResponse(rate_limit_error())
 
         async def event_generator():
             """Generate SSE events for MCP communication."""
-            # Send initial connection event
-            yield {
-                "event": "connected",
-                "data": json.dumps({
-                    "server": "beacon-library",
-                    "version": "1.0.0",
-                    "agent_id": agent_id,
-                }),
-            }
-
-            # Keep connection alive with heartbeats
-            while True:
-                await asyncio.sleep(30)
+            heartbeats = self._subscribe_heartbeats()
+            try:
+                # Send initial connection event (agent_id comes from a header,
+                # so it still goes through the JSON encoder)
                 yield {
-                    "event": "heartbeat",
-                    "data": json.dumps({"timestamp": datetime.now(timezone.utc).isoformat()}),
+                    "event": "connected",
+                    "data": _CONNECTED_PREFIX + orjson.dumps(agent_id).decode() + "}",
                 }
 
+                # Keep connection alive with heartbeats
+                while True:
+                    yield await heartbeats.get()
+            finally:
+                self._heartbeat_subscribers.discard(heartbeats)
+
         return EventSourceResponse(event_generator())
 
+    def _subscribe_heartbeats(self) -> asyncio.Queue:
+        """Register an SSE connection for heartbeats, starting the timer if needed."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        self._heartbeat_subscribers.add(queue)
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        return queue
+
+    async def _heartbeat_loop(self) -> None:
+        """Send a heartbeat to every open SSE connection; exits once none are left."""
+        while self._heartbeat_subscribers:
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+            event = {
+                "event": "heartbeat",
+                "data": _HEARTBEAT_PREFIX
+                + datetime.now(timezone.utc).isoformat()
+                + _HEARTBEAT_SUFFIX,
+            }
+            for queue in self._heartbeat_subscribers:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # A stalled client already has heartbeats queued
+                    pass
+
 
 def create_mcp_server(
     db_session_factory: Callable,
@@ -13,6 +13,7 @@ from app.core.config import settings
 from app.models.directory import Directory
 from app.models.file import FileMetadata, FileVersion
 from app.models.library import Library
+from app.services.cache import file_lookup_cache
 
 if TYPE_CHECKING:
     from app.mcp.server import MCPServer
@@ -481,6 +482,7 @@ def register_tools(server: "MCPServer"):
             db.add(version)
 
             await db.commit()
+            file_lookup_cache.delete(file.id)
 
             logger.info(
                 "mcp_file_updated",
@@ -48,6 +48,8 @@ class AuditAction(str, Enum):
     SHARE_CREATE = "share.create"
     SHARE_ACCESS = "share.access"
     SHARE_REVOKE = "share.revoke"
+    SHARE_UPDATE = "share.update"
+    SHARE_DELETE = "share.delete"
 
     # Permission actions
     PERMISSION_GRANT = "permission.grant"
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -105,6 +105,13 @@ class Directory(Base, TimestampMixin, SoftDeleteMixin):
         ),
         # Index for path-based queries
         Index("ix_directories_library_path", "library_id", "path"),
+        # Keyset pagination of the trash
+        Index(
+            "ix_directories_trash",
+            "deleted_at",
+            "id",
+            postgresql_where=text("is_deleted = true"),
+        ),
     )
 
     def __repr__(self) -> str:
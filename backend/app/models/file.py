@@ -4,9 +4,9 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import BigInteger, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.models.base import Base, SoftDeleteMixin, TimestampMixin, generate_uuid
 
@@ -76,6 +76,13 @@ class FileMetadata(Base, TimestampMixin, SoftDeleteMixin):
         default="application/octet-stream",
     )
 
+    # Language detected from the filename extension (see detect_language_by_ext),
+    # kept in sync by _sync_language so reindex/stats can filter in SQL
+    language: Mapped[Optional[str]] = mapped_column(
+        String(32),
+        nullable=True,
+    )
+
     # MinIO storage reference
     storage_key: Mapped[str] = mapped_column(
         String(1024),
@@ -131,8 +138,36 @@ class FileMetadata(Base, TimestampMixin, SoftDeleteMixin):
         Index("ix_files_library_path", "library_id", "path"),
         # Index for content type queries
         Index("ix_files_content_type", "content_type"),
+        # Index for per-language reindexing and stats
+        Index("ix_files_library_language", "library_id", "language"),
+        # Partial indexes for the common "not deleted" scans
+        Index(
+            "ix_files_active_library",
+            "library_id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_files_active_language",
+            "language",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # Keyset pagination of the trash
+        Index(
+            "ix_files_trash",
+            "deleted_at",
+            "id",
+            postgresql_where=text("is_deleted = true"),
+        ),
     )
 
+    @validates("filename")
+    def _sync_language(self, key: str, filename: str) -> str:
+        """Update the detected language whenever the filename is set."""
+        from app.services.chunking import detect_language_by_ext, file_extension
+
+        self.language = detect_language_by_ext(file_extension(filename)).value
+        return filename
+
     def __repr__(self) -> str:
         return f"<FileMetadata(id={self.id}, filename='{self.filename}', size={self.size_bytes})>"
 
@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -145,6 +145,11 @@ class ShareLink(Base):
         nullable=True,
     )
 
+    __table_args__ = (
+        # Index for listing a user's shares that have not expired
+        Index("ix_share_links_created_by_expires_at", "created_by", "expires_at"),
+    )
+
     def __repr__(self) -> str:
         return f"<ShareLink(id={self.id}, target={self.target_type}:{self.target_id})>"
 
@@ -45,6 +45,10 @@ class TrashListResponse(BaseModel):
     items: list[TrashItemResponse]
     total: int
     total_size_bytes: int
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page (None on the last page)",
+    )
 
 
 class RestoreRequest(BaseModel):
@@ -1,10 +1,11 @@
 """Redis caching service for file and directory metadata."""
 
 import json
+import time
 import uuid
 from datetime import timedelta
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 import redis.asyncio as redis
 import structlog
@@ -302,6 +303,7 @@ class CacheService:
         directory_id: Optional[uuid.UUID] = None,
     ) -> None:
         """Invalidate file and related caches."""
+        file_lookup_cache.delete(file_id)
         await self.delete(self.file_key(file_id))
         await self.delete(self.file_versions_key(file_id))
         # Invalidate directory listings
@@ -334,6 +336,70 @@ class CacheService:
         logger.warning("cache_flushed")
 
 
+class LocalTTLCache:
+    """
+    Small in-process cache with a fixed time-to-live per entry.
+
+    Meant for very short TTLs where a Redis round-trip would cost about as
+    much as the work being cached. Expired entries are dropped lazily on
+    read and swept in bulk once the cache grows past ``max_size``.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1024):
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Get a value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store a value for the configured TTL."""
+        now = time.monotonic()
+        if len(self._entries) >= self._max_size:
+            self._sweep(now)
+        self._entries[key] = (now + self._ttl, value)
+
+    def delete(self, key: Any) -> None:
+        """Remove a single entry."""
+        self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove all entries whose key matches the predicate."""
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries, then the oldest ones if still full."""
+        expired = [key for key, (exp, _) in self._entries.items() if exp <= now]
+        for key in expired:
+            del self._entries[key]
+        # Dicts keep insertion order, so the first keys are the oldest
+        overflow = len(self._entries) - self._max_size + 1
+        for key in list(self._entries)[:max(0, overflow)]:
+            del self._entries[key]
+
+
+# Per-process file lookups for hot read paths (previews, indexing requests).
+# Entries are dropped by CacheService.invalidate_file; other workers see
+# changes once the TTL expires.
+file_lookup_cache = LocalTTLCache(ttl_seconds=30, max_size=10_000)
+
+
 # Singleton instance
 _cache_service: Optional[CacheService] = None
 
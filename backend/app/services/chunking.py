@@ -131,6 +131,21 @@ EXTENSION_TO_LANGUAGE: Dict[str, Language] = {
 }
 
 
+def detect_language_by_ext(ext: str) -> Language:
+    """Map a lowercase file extension (including the dot) to a language."""
+    return EXTENSION_TO_LANGUAGE.get(ext, Language.UNKNOWN)
+
+
+def file_extension(file_name: str) -> str:
+    """Return the lowercase extension of a file name, including the dot.
+
+    Unlike os.path.splitext, dotfiles such as ".py" keep their suffix, which
+    matches how EXTENSION_TO_LANGUAGE suffixes are matched.
+    """
+    dot = file_name.rfind(".")
+    return file_name[dot:].lower() if dot != -1 else ""
+
+
 @dataclass
 class Chunk:
     """Represents a content chunk with metadata."""
@@ -224,10 +239,10 @@ class ChunkingService:
 
     def detect_language(self, file_name: str, content: str = None) -> Language:
         """Detect the programming language from file name and content."""
-        # Check file extension
-        for ext, lang in EXTENSION_TO_LANGUAGE.items():
-            if file_name.lower().endswith(ext):
-                return lang
+        # Check file extension (single dict lookup rather than a suffix scan)
+        lang = detect_language_by_ext(file_extension(file_name))
+        if lang is not Language.UNKNOWN:
+            return lang
 
         # Content-based detection for ambiguous cases
         if content:
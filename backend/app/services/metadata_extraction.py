@@ -13,8 +13,9 @@ from typing import Any, Dict, List, Optional
 import structlog
 
 from app.services.chunking import (
-    EXTENSION_TO_LANGUAGE,
     Language,
+    detect_language_by_ext,
+    file_extension,
 )
 
 logger = structlog.get_logger(__name__)
@@ -143,9 +144,9 @@ class MetadataExtractionService:
     def detect_language(self, file_name: str, content: str = None) -> Language:
         """Detect programming language from file name and content."""
         # Check file extension first
-        for ext, lang in EXTENSION_TO_LANGUAGE.items():
-            if file_name.lower().endswith(ext):
-                return lang
+        lang = detect_language_by_ext(file_extension(file_name))
+        if lang is not Language.UNKNOWN:
+            return lang
 
         # Content-based detection
         if content:
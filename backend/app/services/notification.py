@@ -139,7 +139,11 @@ class NotificationService:
         return result.rowcount > 0
 
     async def mark_all_as_read(self, user_id: uuid.UUID) -> int:
-        """Mark all notifications as read for a user."""
+        """Mark all notifications as read for a user.
+
+        Runs as one bulk UPDATE served by ix_notifications_user_unread,
+        without reconciling the rows against the session's identity map.
+        """
         query = (
             update(Notification)
             .where(
@@ -150,8 +154,9 @@ class NotificationService:
             )
             .values(
                 is_read=True,
-                read_at=datetime.datetime.now(datetime.timezone.utc),
+                read_at=func.now(),
             )
+            .execution_options(synchronize_session=False)
         )
 
         result = await self.db.execute(query)
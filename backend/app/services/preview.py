@@ -1,14 +1,27 @@
 """File preview service using Gotenberg for document conversion."""
 
+import asyncio
 import io
 import uuid
-from typing import Optional, Tuple
+from typing import AsyncIterator, Optional, Tuple
 
 import httpx
 import structlog
 
 from app.core.config import settings
 
+try:
+    # Pillow-SIMD is a drop-in replacement and is picked up transparently
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    # libvips streams pixels instead of decoding the whole image into memory
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
 logger = structlog.get_logger(__name__)
 
 
@@ -69,6 +82,9 @@ DIRECT_RENDER_TYPES = {
 class PreviewService:
     """Service for generating file previews."""
 
+    # Images at least this large are resized with libvips when available
+    LARGE_IMAGE_BYTES = 10 * 1024 * 1024
+
     def __init__(
         self,
         gotenberg_url: str = None,
@@ -112,6 +128,62 @@ class PreviewService:
         # Return as-is for direct render types
         return file_content, mime_type
 
+    async def generate_preview_stream(
+        self,
+        file_content: bytes,
+        file_name: str,
+        mime_type: str,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """Generate a preview for a file as a stream of chunks.
+
+        Converted documents are relayed from Gotenberg as they arrive instead
+        of being buffered first. The preview MIME type is the same as
+        generate_preview's. Conversion errors raise ValueError on the first
+        iteration.
+        """
+        if not self.can_preview(mime_type):
+            raise ValueError(f"Cannot preview file type: {mime_type}")
+
+        if len(file_content) > self.max_file_size:
+            raise ValueError(
+                f"File too large for preview: {len(file_content)} bytes "
+                f"(max: {self.max_file_size})"
+            )
+
+        if not self.needs_conversion(mime_type):
+            yield file_content
+            return
+
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            files = {
+                "files": (file_name, io.BytesIO(file_content), mime_type),
+            }
+            try:
+                async with client.stream(
+                    "POST",
+                    f"{self.gotenberg_url}/forms/libreoffice/convert",
+                    files=files,
+                ) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        yield chunk
+
+            except httpx.HTTPStatusError as e:
+                logger.error(
+                    "gotenberg_conversion_error",
+                    status_code=e.response.status_code,
+                    file_name=file_name,
+                )
+                raise ValueError(f"Document conversion failed: {e.response.status_code}")
+            except httpx.HTTPError as e:
+                logger.error(
+                    "gotenberg_error",
+                    error=str(e),
+                    file_name=file_name,
+                )
+                raise ValueError(f"Document conversion failed: {str(e)}")
+
     async def generate_thumbnail(
         self,
         file_content: bytes,
@@ -127,7 +199,7 @@ class PreviewService:
         """
         # For images, resize directly
         if mime_type.startswith("image/"):
-            return await self._resize_image(file_content, width, height)
+            return await self._resize_image(file_content, mime_type, width, height)
 
         # For documents, first convert to PDF, then to image
         if self.needs_conversion(mime_type):
@@ -215,18 +287,85 @@ class PreviewService:
 
     async def _resize_image(
         self,
+        image_content: bytes,
+        mime_type: str,
+        width: int,
+        height: int,
+    ) -> Tuple[bytes, str]:
+        """Resize an image to fit within width x height.
+
+        Uses Pillow (Pillow-SIMD in the container image) with Lanczos
+        resampling, which has AVX2-accelerated convolution paths. Images of
+        LARGE_IMAGE_BYTES or more go to libvips instead, which shrinks while
+        decoding and keeps peak memory low. Falls back to the original image
+        when neither library is available or the format cannot be decoded
+        (e.g. SVG).
+        """
+        if mime_type == "image/svg+xml":
+            return image_content, mime_type
+
+        if pyvips is not None and (
+            Image is None or len(image_content) >= self.LARGE_IMAGE_BYTES
+        ):
+            resize = self._resize_image_vips_sync
+        elif Image is not None:
+            resize = self._resize_image_sync
+        else:
+            return image_content, mime_type
+
+        try:
+            # Resizing is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(resize, image_content, width, height)
+        except Exception as e:
+            logger.warning("image_resize_error", error=str(e))
+            return image_content, mime_type
+
+    @staticmethod
+    def _resize_image_sync(
         image_content: bytes,
         width: int,
         height: int,
     ) -> Tuple[bytes, str]:
-        """Resize an image.
+        """Decode, resize and re-encode an image (blocking).
 
-        Note: For production, use PIL/Pillow for local processing.
-        This is a placeholder that returns the original image.
+        With ``reducing_gap`` Pillow first shrinks large sources by an integer
+        box reduction and only runs Lanczos on the last (at most 2x) step.
+        That works for every image mode and never exceeds the requested box.
         """
-        # TODO: Implement actual image resizing with Pillow
-        # For now, return original image
-        return image_content, "image/png"
+        with Image.open(io.BytesIO(image_content)) as img:
+            # For JPEGs, let libjpeg decode at a DCT scale (1/2, 1/4, 1/8)
+            # that still leaves 2x headroom for the final resize.
+            # No-op for other formats.
+            img.draft("RGB", (width * 2, height * 2))
+
+            img.thumbnail((width, height), Image.LANCZOS, reducing_gap=2.0)
+
+            output = io.BytesIO()
+            if img.mode in ("RGB", "L"):
+                img.save(output, format="JPEG", quality=85)
+                return output.getvalue(), "image/jpeg"
+
+            img.save(output, format="PNG")
+            return output.getvalue(), "image/png"
+
+    @staticmethod
+    def _resize_image_vips_sync(
+        image_content: bytes,
+        width: int,
+        height: int,
+    ) -> Tuple[bytes, str]:
+        """Resize and re-encode an image with libvips (blocking)."""
+        img = pyvips.Image.thumbnail_buffer(
+            image_content,
+            width,
+            height=height,
+            size="down",
+        )
+
+        # Keep an alpha channel as PNG, like the Pillow path
+        if img.hasalpha():
+            return img.write_to_buffer(".png"), "image/png"
+        return img.write_to_buffer(".jpg", Q=85), "image/jpeg"
 
     async def _text_to_image(
         self,
@@ -288,6 +427,9 @@ class PreviewService:
 class PreviewCacheService:
     """Cache for file previews."""
 
+    # Rendered previews above this size are not worth the Redis memory
+    MAX_CACHED_BYTES = 2 * 1024 * 1024
+
     def __init__(self, cache_service):
         self.cache = cache_service
         self.ttl = 3600 * 24  # 24 hours
@@ -313,15 +455,16 @@ class PreviewCacheService:
         content: bytes,
         mime_type: str,
         preview_type: str = "full",
+        ttl: Optional[int] = None,
     ) -> None:
-        """Cache a preview."""
+        """Cache a preview (skipped for previews above MAX_CACHED_BYTES)."""
+        if len(content) > self.MAX_CACHED_BYTES:
+            return
         import base64
         key = f"preview:{file_id}:{preview_type}"
         data = f"{mime_type}:{base64.b64encode(content).decode()}"
-        await self.cache.set(key, data, ttl=self.ttl)
+        await self.cache.set(key, data, ttl=ttl or self.ttl)
 
     async def invalidate_preview(self, file_id: uuid.UUID) -> None:
         """Invalidate all cached previews for a file."""
-        for preview_type in ["full", "thumbnail"]:
-            key = f"preview:{file_id}:{preview_type}"
-            await self.cache.delete(key)
+        await self.cache.delete_pattern(f"preview:{file_id}:*")
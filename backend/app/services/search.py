@@ -8,18 +8,39 @@ Enhanced with:
 """
 
 import asyncio
+import hashlib
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import httpx
+import numpy as np
 import structlog
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.http import get_http_client
 from app.models.file import FileMetadata
 from app.models.library import Library
 
+try:
+    # SIMD dot-product kernels (AVX2/AVX-512/NEON); numpy is the fallback
+    import simsimd
+except ImportError:
+    simsimd = None
+
 logger = structlog.get_logger(__name__)
 
 # Background indexing queue
@@ -27,45 +48,256 @@ _indexing_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
 _indexing_task: Optional[asyncio.Task] = None
 
 
+class _CachedSearch(NamedTuple):
+    """A cached search result set."""
+
+    # int8-quantized query embedding and its dequantization scale
+    embedding: np.ndarray
+    scale: float
+    results: List[Dict[str, Any]]
+    expires_at: float
+
+
+def _cosine_distance(distance: float, space: str) -> float:
+    """Convert a Chroma distance to cosine distance (1 - cos).
+
+    Embeddings are unit length, so "ip" and "cosine" already return 1 - cos,
+    while "l2" (Chroma's default, squared) returns 2 - 2cos.
+    """
+    if space == "l2":
+        return distance / 2
+    return distance
+
+
+def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Quantize a vector to int8 with a symmetric per-vector scale."""
+    peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+    scale = peak / 127 if peak else 1.0
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+class SemanticQueryCache:
+    """
+    In-process cache of search results keyed by query embedding.
+
+    A query with the same filters as an earlier one reuses its results when
+    the two embeddings have a cosine similarity of at least ``threshold``.
+    Repeats of the exact same query text skip the embedding call entirely.
+    Entries expire after ``ttl_seconds``, and the least recently used are
+    evicted beyond ``max_entries``.
+
+    Embeddings are kept as int8 with a per-vector scale, a quarter of the
+    float32 footprint; the similarity error is far below the threshold's
+    granularity.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int):
+        self._threshold = threshold
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        # (filters, query) -> entry, in LRU order
+        self._entries: "OrderedDict[Tuple[Hashable, str], _CachedSearch]" = OrderedDict()
+        # filters -> keys of its entries, and a lazily built int8 embedding
+        # matrix with its per-row scales
+        self._buckets: Dict[Hashable, List[Tuple[Hashable, str]]] = {}
+        self._matrices: Dict[Hashable, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def normalize(embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get_exact(self, filters: Hashable, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Get results cached for exactly this query text and filters."""
+        key = (filters, query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.results
+
+    def get_similar(
+        self,
+        filters: Hashable,
+        embedding: np.ndarray,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Get results cached for the most similar query with these filters."""
+        keys = self._buckets.get(filters)
+        if not keys:
+            return None
+
+        cached = self._matrices.get(filters)
+        if cached is None:
+            entries = [self._entries[key] for key in keys]
+            matrix = np.stack([entry.embedding for entry in entries])
+            if simsimd is None:
+                # numpy has no BLAS path for integer matmul; int8 dot sums
+                # stay below 2**24, so float32 BLAS gives exact results
+                matrix = matrix.astype(np.float32)
+            cached = (
+                matrix,
+                np.array([entry.scale for entry in entries], dtype=np.float32),
+            )
+            self._matrices[filters] = cached
+        matrix, scales = cached
+
+        if matrix.shape[1] != embedding.shape[0]:
+            # Embedding model changed; nothing here is comparable
+            return None
+
+        # Rows are unit vectors, so the rescaled integer dot product is the
+        # cosine similarity
+        quantized, scale = _quantize(embedding)
+        if simsimd is not None:
+            dots = np.asarray(simsimd.cdist(quantized[None, :], matrix, metric="dot"))[0]
+        else:
+            dots = matrix @ quantized.astype(np.float32)
+        scores = dots * scales * scale
+        best = int(np.argmax(scores))
+        if scores[best] < self._threshold:
+            return None
+        return self.get_exact(*keys[best])
+
+    def put(
+        self,
+        filters: Hashable,
+        query: str,
+        embedding: np.ndarray,
+        results: List[Dict[str, Any]],
+    ) -> None:
+        """Cache the results of a query."""
+        key = (filters, query)
+        if key in self._entries:
+            self._remove(key)
+
+        quantized, scale = _quantize(embedding)
+        self._entries[key] = _CachedSearch(
+            embedding=quantized,
+            scale=scale,
+            results=results,
+            expires_at=time.monotonic() + self._ttl,
+        )
+        self._buckets.setdefault(filters, []).append(key)
+        self._matrices.pop(filters, None)
+
+        while len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, match: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose filters satisfy ``match``."""
+        for filters in [filters for filters in self._buckets if match(filters)]:
+            for key in self._buckets.pop(filters):
+                del self._entries[key]
+            self._matrices.pop(filters, None)
+
+    def _remove(self, key: Tuple[Hashable, str]) -> None:
+        """Drop an entry and its bucket slot."""
+        del self._entries[key]
+        filters = key[0]
+        keys = self._buckets[filters]
+        keys.remove(key)
+        if not keys:
+            del self._buckets[filters]
+        self._matrices.pop(filters, None)
+
+
+# Shared by all SemanticSearchService instances in this process
+_query_cache: Optional[SemanticQueryCache] = (
+    SemanticQueryCache(
+        threshold=settings.search_cache_similarity,
+        ttl_seconds=settings.search_cache_ttl,
+        max_entries=settings.search_cache_max_entries,
+    )
+    if settings.search_cache_ttl > 0
+    else None
+)
+
+
+def invalidate_search_cache(library_id: uuid.UUID) -> None:
+    """Forget this process's cached searches that may cover a library.
+
+    Cached searches hold raw vector store hits, and file metadata is
+    reloaded on every hit, so this only matters when indexed content
+    changes. Searches across all libraries are dropped too.
+    """
+    if _query_cache is not None:
+        _query_cache.invalidate(
+            lambda filters: filters[0] is None or filters[0] == library_id
+        )
+
+
+def index_fingerprint(file: FileMetadata) -> str:
+    """Fingerprint of everything that shapes a file's vector-store entries.
+
+    Content identity comes from the SHA-256 checksum recorded at upload, so
+    nothing is rehashed here. Renames, moves and a change of embedding model
+    or chunking mode all change the fingerprint and force a reindex.
+    """
+    key = "\0".join((
+        file.checksum_sha256 or "",
+        file.filename,
+        file.path or "",
+        settings.ollama_embedding_model,
+        str(settings.enable_code_analysis),
+    ))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
 class OllamaEmbeddingService:
     """Service for generating embeddings using Ollama."""
 
+    # Parallel embedding requests per batch
+    MAX_CONCURRENT_REQUESTS = 8
+
     def __init__(
         self,
         base_url: str = None,
         model: str = None,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.base_url = base_url or settings.ollama_url
         self.model = model or settings.ollama_embedding_model
+        self.client = client or get_http_client()
 
     async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/embeddings",
-                    json={
-                        "model": self.model,
-                        "prompt": text,
-                    },
-                    timeout=30.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("embedding", [])
-            except Exception as e:
-                logger.error("ollama_embedding_error", error=str(e))
-                raise
+        """Generate an L2-normalized embedding for a single text."""
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/api/embeddings",
+                json={
+                    "model": self.model,
+                    "prompt": text,
+                },
+                timeout=30.0,
+            )
+            response.raise_for_status()
+            data = response.json()
+            # Unit length, so stored and query vectors compare by inner product
+            return SemanticQueryCache.normalize(data.get("embedding", [])).tolist()
+        except Exception as e:
+            logger.error("ollama_embedding_error", error=str(e))
+            raise
 
     async def generate_embeddings_batch(
         self, texts: List[str]
     ) -> List[List[float]]:
-        """Generate embeddings for multiple texts."""
-        embeddings = []
-        for text in texts:
-            embedding = await self.generate_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+        """Generate embeddings for multiple texts.
+
+        Requests run concurrently (up to MAX_CONCURRENT_REQUESTS) over the
+        shared connection pool; results keep the input order.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        async def embed(text: str) -> List[float]:
+            async with semaphore:
+                return await self.generate_embedding(text)
+
+        return list(await asyncio.gather(*(embed(text) for text in texts)))
 
 
 class ChromaDBService:
@@ -96,9 +328,13 @@ class ChromaDBService:
             return self._collection_cache[collection_name]
 
         try:
+            # Embeddings are unit length, so inner product ranks like cosine
+            # without the per-comparison norms. Existing collections keep the
+            # metric they were created with (Chroma ignores the metadata), so
+            # search_batch converts every distance to one scale.
             collection = self._client.get_or_create_collection(
                 name=collection_name,
-                metadata={"library_id": str(library_id)},
+                metadata={"library_id": str(library_id), "hnsw:space": "ip"},
             )
             self._collection_cache[collection_name] = collection
             return collection
@@ -162,6 +398,36 @@ class ChromaDBService:
             )
             return False
 
+    async def set_file_fingerprint(
+        self,
+        library_id: uuid.UUID,
+        document_ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        fingerprint: str,
+    ) -> bool:
+        """Stamp a file's stored chunks with its index fingerprint.
+
+        Done as a final update once every chunk is in, so a partially
+        indexed file never looks up to date to the indexing worker.
+        """
+        try:
+            collection = self._get_or_create_collection(library_id)
+            collection.update(
+                ids=document_ids,
+                metadatas=[
+                    {**metadata, "index_fingerprint": fingerprint}
+                    for metadata in metadatas
+                ],
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                "chromadb_set_fingerprint_error",
+                count=len(document_ids),
+                error=str(e),
+            )
+            return False
+
     async def update_document(
         self,
         library_id: uuid.UUID,
@@ -257,10 +523,32 @@ class ChromaDBService:
         where: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """Search for similar documents."""
+        return (
+            await self.search_batch(
+                library_id=library_id,
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where,
+            )
+        )[0]
+
+    async def search_batch(
+        self,
+        library_id: uuid.UUID,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for documents similar to each embedding in one query.
+
+        Returns one result list per embedding, in input order. Distances
+        are cosine distances whatever metric the collection was created with,
+        so results from different libraries can be merged by distance.
+        """
         try:
             collection = self._get_or_create_collection(library_id)
             query_params = {
-                "query_embeddings": [query_embedding],
+                "query_embeddings": query_embeddings,
                 "n_results": n_results,
                 "include": ["documents", "metadatas", "distances"],
             }
@@ -268,35 +556,61 @@ class ChromaDBService:
                 query_params["where"] = where
 
             data = collection.query(**query_params)
+            space = (collection.metadata or {}).get("hnsw:space", "l2")
 
             # Parse results
-            results = []
-            if data.get("ids") and data["ids"][0]:
-                for i, doc_id in enumerate(data["ids"][0]):
+            batch_results = []
+            for q, ids in enumerate(data.get("ids") or [[] for _ in query_embeddings]):
+                results = []
+                for i, doc_id in enumerate(ids):
                     results.append({
                         "id": doc_id,
                         "document": (
-                            data["documents"][0][i]
+                            data["documents"][q][i]
                             if data.get("documents") else None
                         ),
                         "metadata": (
-                            data["metadatas"][0][i]
+                            data["metadatas"][q][i]
                             if data.get("metadatas") else {}
                         ),
                         "distance": (
-                            data["distances"][0][i]
+                            _cosine_distance(data["distances"][q][i], space)
                             if data.get("distances") else 0
                         ),
                     })
+                batch_results.append(results)
 
-            return results
+            return batch_results
         except Exception as e:
             logger.error(
                 "chromadb_search_error",
                 library_id=str(library_id),
                 error=str(e),
             )
-            return []
+            return [[] for _ in query_embeddings]
+
+    async def get_file_fingerprint(
+        self,
+        library_id: uuid.UUID,
+        file_id: str,
+    ) -> Optional[str]:
+        """Get the index fingerprint stored with a file's entries, if any."""
+        try:
+            collection = self._get_or_create_collection(library_id)
+            results = collection.get(
+                where={"file_id": file_id},
+                limit=1,
+                include=["metadatas"],
+            )
+            metadatas = results.get("metadatas") or []
+            return metadatas[0].get("index_fingerprint") if metadatas else None
+        except Exception as e:
+            logger.warning(
+                "chromadb_get_fingerprint_error",
+                file_id=file_id,
+                error=str(e),
+            )
+            return None
 
     async def get_chunks_by_file(
         self,
@@ -377,6 +691,7 @@ class SemanticSearchService:
             "library_id": str(file.library_id),
             "chunk_type": "full",
             "chunk_index": 0,
+            "index_fingerprint": index_fingerprint(file),
         }
 
         return await self.vector_store.add_document(
@@ -460,18 +775,14 @@ class SemanticSearchService:
         contents = []
         embeddings = []
         metadatas = []
+        failed_chunks = 0
 
         for chunk in chunks:
-            chunk_id = f"{file_id}:chunk:{chunk.index}"
-            document_ids.append(chunk_id)
-            contents.append(chunk.content)
-
             # Generate embedding for this chunk
             try:
                 # Truncate chunk content for embedding
                 chunk_text = chunk.content[:8000]
                 embedding = await self.embedding_service.generate_embedding(chunk_text)
-                embeddings.append(embedding)
             except Exception as e:
                 logger.error(
                     "chunk_embedding_error",
@@ -479,8 +790,13 @@ class SemanticSearchService:
                     chunk_index=chunk.index,
                     error=str(e),
                 )
+                failed_chunks += 1
                 continue
 
+            document_ids.append(f"{file_id}:chunk:{chunk.index}")
+            contents.append(chunk.content)
+            embeddings.append(embedding)
+
             # Build chunk metadata
             chunk_metadata = {
                 # File identification
@@ -535,6 +851,16 @@ class SemanticSearchService:
                 metadatas=metadatas,
             )
 
+            # Only a complete index gets a fingerprint; otherwise the next
+            # queued run retries the file instead of skipping it
+            if success and not failed_chunks:
+                await self.vector_store.set_file_fingerprint(
+                    library_id=file.library_id,
+                    document_ids=document_ids,
+                    metadatas=metadatas,
+                    fingerprint=index_fingerprint(file),
+                )
+
             if success:
                 logger.info(
                     "index_file_chunked_complete",
@@ -625,6 +951,7 @@ class SemanticSearchService:
             library_id=library_id,
             document_id=str(file_id),
         )
+        invalidate_search_cache(library_id)
 
         return success
 
@@ -654,14 +981,104 @@ class SemanticSearchService:
         Returns:
             List of search results with metadata
         """
-        # Generate query embedding
+        cache_filters = (
+            library_id,
+            limit,
+            mime_type_filter,
+            language_filter,
+            chunk_type_filter,
+            include_context,
+            group_by_file,
+        )
+        # The cache holds raw vector store hits; file metadata is reloaded
+        # below either way, so deleted, moved or renamed files never come
+        # back stale
+        results = None
+        if _query_cache is not None:
+            results = _query_cache.get_exact(cache_filters, query)
+
+        if results is None:
+            # Generate query embedding
+            try:
+                query_embedding = await self.embedding_service.generate_embedding(query)
+            except Exception as e:
+                logger.error("search_embedding_error", query=query, error=str(e))
+                return []
+
+            if _query_cache is not None:
+                normalized_embedding = np.asarray(query_embedding, dtype=np.float32)
+                results = _query_cache.get_similar(cache_filters, normalized_embedding)
+                if results is not None:
+                    logger.debug("search_cache_hit", query=query)
+
+        if results is None:
+            where_clause = self._build_where(
+                mime_type_filter, language_filter, chunk_type_filter
+            )
+            results = (
+                await self._query_vector_store(
+                    [query_embedding], library_id, limit, where_clause, group_by_file
+                )
+            )[0]
+
+            # Empty results may come from a vector store error; don't pin them
+            if _query_cache is not None and results:
+                _query_cache.put(cache_filters, query, normalized_embedding, results)
+
+        files = await self._load_files(results)
+        return await self._enrich_results(
+            results, files, limit, include_context, group_by_file
+        )
+
+    async def search_batch(
+        self,
+        queries: List[str],
+        library_id: Optional[uuid.UUID] = None,
+        limit: int = 10,
+        mime_type_filter: Optional[str] = None,
+        language_filter: Optional[str] = None,
+        chunk_type_filter: Optional[str] = None,
+        include_context: bool = False,
+        group_by_file: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run several searches with shared filters.
+
+        Queries are embedded concurrently. Each collection is queried once
+        for all of them, and file metadata is loaded in a single query.
+
+        Returns:
+            One result list per query, in input order
+        """
         try:
-            query_embedding = await self.embedding_service.generate_embedding(query)
+            embeddings = await self.embedding_service.generate_embeddings_batch(queries)
         except Exception as e:
-            logger.error("search_embedding_error", query=query, error=str(e))
-            return []
+            logger.error("search_embedding_error", queries=len(queries), error=str(e))
+            return [[] for _ in queries]
+
+        where_clause = self._build_where(
+            mime_type_filter, language_filter, chunk_type_filter
+        )
+        results_per_query = await self._query_vector_store(
+            embeddings, library_id, limit, where_clause, group_by_file
+        )
+        files = await self._load_files(
+            [result for results in results_per_query for result in results]
+        )
 
-        # Build where filter
+        return [
+            await self._enrich_results(
+                results, files, limit, include_context, group_by_file
+            )
+            for results in results_per_query
+        ]
+
+    @staticmethod
+    def _build_where(
+        mime_type_filter: Optional[str],
+        language_filter: Optional[str],
+        chunk_type_filter: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
+        """Build the vector store metadata filter."""
         where = {}
         if mime_type_filter:
             where["mime_type"] = mime_type_filter
@@ -670,38 +1087,81 @@ class SemanticSearchService:
         if chunk_type_filter:
             where["chunk_type"] = chunk_type_filter
 
-        where_clause = where if where else None
+        return where if where else None
+
+    async def _query_vector_store(
+        self,
+        query_embeddings: List[List[float]],
+        library_id: Optional[uuid.UUID],
+        limit: int,
+        where: Optional[Dict[str, Any]],
+        group_by_file: bool,
+    ) -> List[List[Dict[str, Any]]]:
+        """Get the nearest chunks for each query embedding."""
+        # Fetch more for grouping
+        n_results = limit * 2 if group_by_file else limit
 
-        # Search across libraries
         if library_id:
             # Search single library
-            results = await self.vector_store.search(
+            return await self.vector_store.search_batch(
                 library_id=library_id,
-                query_embedding=query_embedding,
-                n_results=limit * 2 if group_by_file else limit,  # Fetch more for grouping
-                where=where_clause,
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
             )
-        else:
-            # Search all libraries
-            lib_query = select(Library).where(Library.is_deleted.is_(False))
-            lib_result = await self.db.execute(lib_query)
-            libraries = lib_result.scalars().all()
-
-            all_results = []
-            for lib in libraries:
-                lib_results = await self.vector_store.search(
-                    library_id=lib.id,
-                    query_embedding=query_embedding,
-                    n_results=limit,
-                    where=where_clause,
-                )
-                all_results.extend(lib_results)
 
-            # Sort by distance and limit
-            all_results.sort(key=lambda x: x.get("distance", float("inf")))
-            results = all_results[:limit * 2 if group_by_file else limit]
+        # Search all libraries
+        lib_query = select(Library.id).where(Library.is_deleted.is_(False))
+        lib_result = await self.db.execute(lib_query)
+        library_ids = lib_result.scalars().all()
+
+        all_results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+        for lib_id in library_ids:
+            lib_results = await self.vector_store.search_batch(
+                library_id=lib_id,
+                query_embeddings=query_embeddings,
+                n_results=limit,
+                where=where,
+            )
+            for merged, results in zip(all_results, lib_results):
+                merged.extend(results)
+
+        # Sort by distance and limit
+        for results in all_results:
+            results.sort(key=lambda x: x.get("distance", float("inf")))
+        return [results[:n_results] for results in all_results]
+
+    async def _load_files(
+        self,
+        results: List[Dict[str, Any]],
+    ) -> Dict[str, FileMetadata]:
+        """Load the non-deleted files referenced by search results, by id."""
+        file_ids = {
+            result.get("metadata", {}).get("file_id")
+            for result in results
+        }
+        file_ids.discard(None)
+        if not file_ids:
+            return {}
+
+        file_query = select(FileMetadata).where(
+            and_(
+                FileMetadata.id.in_([uuid.UUID(file_id) for file_id in file_ids]),
+                FileMetadata.is_deleted.is_(False),
+            )
+        )
+        file_result = await self.db.execute(file_query)
+        return {str(file.id): file for file in file_result.scalars().all()}
 
-        # Enrich results with file metadata
+    async def _enrich_results(
+        self,
+        results: List[Dict[str, Any]],
+        files: Dict[str, FileMetadata],
+        limit: int,
+        include_context: bool,
+        group_by_file: bool,
+    ) -> List[Dict[str, Any]]:
+        """Attach file metadata to raw vector store hits."""
         enriched_results = []
         seen_files = set()
 
@@ -716,16 +1176,7 @@ class SemanticSearchService:
             if group_by_file and file_id in seen_files:
                 continue
 
-            # Get file from database
-            file_query = select(FileMetadata).where(
-                and_(
-                    FileMetadata.id == uuid.UUID(file_id),
-                    FileMetadata.is_deleted.is_(False),
-                )
-            )
-            file_result = await self.db.execute(file_query)
-            file = file_result.scalar_one_or_none()
-
+            file = files.get(file_id)
             if not file:
                 continue
 
@@ -849,6 +1300,7 @@ async def start_indexing_worker(db_session_factory, storage_service):
                                 library_id=library_id,
                                 document_id=str(file_id),
                             )
+                            invalidate_search_cache(library_id)
                             logger.info(
                                 "deindex_file_complete",
                                 file_id=str(file_id),
@@ -869,6 +1321,7 @@ async def start_indexing_worker(db_session_factory, storage_service):
                         try:
                             vector_store = ChromaDBService()
                             await vector_store.delete_library_collection(library_id)
+                            invalidate_search_cache(library_id)
                             logger.info(
                                 "deindex_library_complete",
                                 library_id=str(library_id),
@@ -908,6 +1361,21 @@ async def start_indexing_worker(db_session_factory, storage_service):
                         _indexing_queue.task_done()
                         continue
 
+                    # Unchanged since it was last indexed: skip the download,
+                    # extraction, embedding and vector-store writes, unless
+                    # the reindex was explicitly requested
+                    vector_store = ChromaDBService()
+                    if not item.get("force") and (
+                        await vector_store.get_file_fingerprint(
+                            library_id=file.library_id,
+                            file_id=str(file.id),
+                        )
+                        == index_fingerprint(file)
+                    ):
+                        logger.info("indexing_file_unchanged", file_id=str(file_id))
+                        _indexing_queue.task_done()
+                        continue
+
                     # Check if content can be extracted
                     if not content_extraction_service.can_extract(file.content_type, file.filename):
                         # Still index with filename/metadata only
@@ -964,7 +1432,9 @@ async def start_indexing_worker(db_session_factory, storage_service):
                             extracted_text = None
 
                     # Index the content using chunked approach if enabled
-                    search_service = SemanticSearchService(db=db)
+                    search_service = SemanticSearchService(
+                        db=db, vector_store=vector_store
+                    )
 
                     if settings.enable_code_analysis and extracted_text:
                         # Use smart chunking for better search
@@ -982,6 +1452,7 @@ async def start_indexing_worker(db_session_factory, storage_service):
                         )
 
                     if success:
+                        invalidate_search_cache(file.library_id)
                         logger.info(
                             "indexing_file_complete",
                             file_id=str(file_id),
@@ -1009,13 +1480,22 @@ async def start_indexing_worker(db_session_factory, storage_service):
     logger.info("indexing_worker_started")
 
 
-async def queue_file_for_indexing(file_id: uuid.UUID, library_id: uuid.UUID):
-    """Queue a file for background indexing."""
+async def queue_file_for_indexing(
+    file_id: uuid.UUID,
+    library_id: uuid.UUID,
+    force: bool = False,
+):
+    """Queue a file for background indexing.
+
+    With ``force`` the file is reindexed even if its stored fingerprint says
+    it is unchanged.
+    """
     try:
         _indexing_queue.put_nowait({
             "action": "index",
             "file_id": file_id,
             "library_id": library_id,
+            "force": force,
         })
         logger.debug("file_queued_for_indexing", file_id=str(file_id))
     except asyncio.QueueFull:
@@ -1026,6 +1506,38 @@ async def queue_file_for_indexing(file_id: uuid.UUID, library_id: uuid.UUID):
         )
 
 
+async def queue_files_for_indexing(
+    files: Sequence[Tuple[uuid.UUID, uuid.UUID]],
+    force: bool = False,
+) -> int:
+    """Queue a batch of (file_id, library_id) pairs for background indexing.
+
+    Returns the number of files queued; the rest are dropped with a single
+    warning once the queue is full. ``force`` works as in
+    queue_file_for_indexing.
+    """
+    queued = 0
+    for file_id, library_id in files:
+        try:
+            _indexing_queue.put_nowait({
+                "action": "index",
+                "file_id": file_id,
+                "library_id": library_id,
+                "force": force,
+            })
+        except asyncio.QueueFull:
+            logger.warning(
+                "indexing_queue_full",
+                dropped=len(files) - queued,
+                message="Files will not be indexed",
+            )
+            break
+        queued += 1
+
+    logger.debug("files_queued_for_indexing", count=queued)
+    return queued
+
+
 async def queue_file_for_deindexing(file_id: uuid.UUID, library_id: uuid.UUID):
     """Queue a file for removal from the vector index."""
     try:
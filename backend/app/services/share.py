@@ -1,16 +1,21 @@
 """Share link service for managing file/directory/library sharing."""
 
+import asyncio
 import datetime
 import hashlib
 import secrets
+import time
 import uuid
-from typing import Optional
+from typing import Optional, Tuple
 
+import httpx
 import structlog
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.audit import AuditEvent
+from app.core.correlation import get_correlation_id
+from app.core.http import get_http_client
+from app.models.audit import ActorType, AuditAction, AuditEvent
 from app.models.directory import Directory
 from app.models.file import FileMetadata
 from app.models.library import Library
@@ -30,6 +35,16 @@ from app.schemas.share import (
 
 logger = structlog.get_logger(__name__)
 
+# Share access audit rows are buffered and bulk-inserted in the background so
+# visitors don't wait on the audit write
+ACCESS_LOG_BATCH_SIZE = 500
+ACCESS_LOG_FLUSH_INTERVAL_SECONDS = 0.1
+
+_access_log_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+_access_log_task: Optional[asyncio.Task] = None
+# Queued by stop_access_log_writer; the writer flushes its batch and exits
+_STOP_WRITER = object()
+
 
 class ShareService:
     """Service for managing share links."""
@@ -74,11 +89,13 @@ class ShareService:
         self.db.add(share_link)
 
         # Log audit event
-        audit_event = AuditEvent(
-            event_type="share_created",
-            resource_type=data.target_type.value,
-            resource_id=data.target_id,
-            user_id=user_id,
+        audit_event = AuditEvent.create(
+            action=AuditAction.SHARE_CREATE,
+            actor_type=ActorType.USER,
+            actor_id=str(user_id),
+            target_type=data.target_type.value,
+            target_id=data.target_id,
+            correlation_id=get_correlation_id(),
             details={
                 "share_type": data.share_type.value,
                 "expires_at": data.expires_at.isoformat() if data.expires_at else None,
@@ -137,6 +154,58 @@ class ShareService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_share_with_target_by_token(
+        self,
+        token: str,
+    ) -> Optional[Tuple[ShareLink, Optional[str]]]:
+        """Get a share link by its token together with its target's name.
+
+        The target is outer-joined in the same query, so the public share
+        paths need a single round-trip. The name is None if the target no
+        longer exists.
+        """
+        target_name = func.coalesce(FileMetadata.filename, Directory.name, Library.name)
+        query = (
+            select(ShareLink, target_name)
+            .outerjoin(
+                FileMetadata,
+                and_(
+                    ShareLink.target_type == ShareTargetType.FILE.value,
+                    FileMetadata.id == ShareLink.target_id,
+                    FileMetadata.is_deleted == False,
+                ),
+            )
+            .outerjoin(
+                Directory,
+                and_(
+                    ShareLink.target_type == ShareTargetType.DIRECTORY.value,
+                    Directory.id == ShareLink.target_id,
+                    Directory.is_deleted == False,
+                ),
+            )
+            .outerjoin(
+                Library,
+                and_(
+                    ShareLink.target_type == ShareTargetType.LIBRARY.value,
+                    Library.id == ShareLink.target_id,
+                    Library.is_deleted == False,
+                ),
+            )
+            .where(
+                and_(
+                    ShareLink.token == token,
+                    ShareLink.is_deleted == False,
+                    ShareLink.is_active == True,
+                )
+            )
+        )
+
+        result = await self.db.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return row[0], row[1]
+
     async def list_shares_for_resource(
         self,
         target_type: ShareTargetType,
@@ -218,12 +287,17 @@ class ShareService:
                 setattr(share_link, field, value)
 
         # Log audit event
-        audit_event = AuditEvent(
-            event_type="share_updated",
-            resource_type=share_link.target_type,
-            resource_id=share_link.target_id,
-            user_id=user_id,
-            details={"updated_fields": list(update_data.keys())},
+        audit_event = AuditEvent.create(
+            action=AuditAction.SHARE_UPDATE,
+            actor_type=ActorType.USER,
+            actor_id=str(user_id),
+            target_type=share_link.target_type,
+            target_id=share_link.target_id,
+            correlation_id=get_correlation_id(),
+            details={
+                "share_id": str(share_id),
+                "updated_fields": list(update_data.keys()),
+            },
         )
         self.db.add(audit_event)
 
@@ -242,30 +316,44 @@ class ShareService:
         self,
         share_id: uuid.UUID,
         user_id: uuid.UUID,
-    ) -> bool:
-        """Revoke (deactivate) a share link."""
+    ) -> Optional[str]:
+        """Revoke (deactivate) a share link.
+
+        Returns the link's token, or None if no such link exists. Revoking
+        an already revoked link succeeds without writing. The row is locked
+        so concurrent revokes of the same link write only once.
+        """
         query = select(ShareLink).where(
             and_(
                 ShareLink.id == share_id,
                 ShareLink.created_by == user_id,
                 ShareLink.is_deleted == False,
             )
-        )
+        ).with_for_update()
 
         result = await self.db.execute(query)
         share_link = result.scalar_one_or_none()
 
         if not share_link:
-            return False
+            return None
+
+        token = share_link.token
+        if not share_link.is_active:
+            # Nothing to write; committing ends the transaction and releases
+            # the row lock
+            await self.db.commit()
+            return token
 
         share_link.is_active = False
 
         # Log audit event
-        audit_event = AuditEvent(
-            event_type="share_revoked",
-            resource_type=share_link.target_type,
-            resource_id=share_link.target_id,
-            user_id=user_id,
+        audit_event = AuditEvent.create(
+            action=AuditAction.SHARE_REVOKE,
+            actor_type=ActorType.USER,
+            actor_id=str(user_id),
+            target_type=share_link.target_type,
+            target_id=share_link.target_id,
+            correlation_id=get_correlation_id(),
             details={"share_id": str(share_id)},
         )
         self.db.add(audit_event)
@@ -278,37 +366,43 @@ class ShareService:
             user_id=str(user_id),
         )
 
-        return True
+        return token
 
     async def delete_share_link(
         self,
         share_id: uuid.UUID,
         user_id: uuid.UUID,
-    ) -> bool:
-        """Soft delete a share link."""
+    ) -> Optional[str]:
+        """Soft delete a share link.
+
+        Returns the link's token, or None if no such link exists.
+        """
         query = select(ShareLink).where(
             and_(
                 ShareLink.id == share_id,
                 ShareLink.created_by == user_id,
                 ShareLink.is_deleted == False,
             )
-        )
+        ).with_for_update()
 
         result = await self.db.execute(query)
         share_link = result.scalar_one_or_none()
 
         if not share_link:
-            return False
+            return None
 
+        token = share_link.token
         share_link.is_deleted = True
         share_link.is_active = False
 
         # Log audit event
-        audit_event = AuditEvent(
-            event_type="share_deleted",
-            resource_type=share_link.target_type,
-            resource_id=share_link.target_id,
-            user_id=user_id,
+        audit_event = AuditEvent.create(
+            action=AuditAction.SHARE_DELETE,
+            actor_type=ActorType.USER,
+            actor_id=str(user_id),
+            target_type=share_link.target_type,
+            target_id=share_link.target_id,
+            correlation_id=get_correlation_id(),
             details={"share_id": str(share_id)},
         )
         self.db.add(audit_event)
@@ -321,7 +415,7 @@ class ShareService:
             user_id=str(user_id),
         )
 
-        return True
+        return token
 
     async def access_share(
         self,
@@ -330,11 +424,13 @@ class ShareService:
         visitor_ip: Optional[str] = None,
     ) -> ShareAccessResponse:
         """Access a shared resource via share link."""
-        share_link = await self.get_share_by_token(token)
+        row = await self.get_share_with_target_by_token(token)
 
-        if not share_link:
+        if not row:
             raise ValueError("Share link not found or has been revoked")
 
+        share_link, target_name = row
+
         # Check if expired
         if share_link.expires_at and share_link.expires_at < datetime.datetime.now(
             datetime.timezone.utc
@@ -355,30 +451,30 @@ class ShareService:
             if not self._verify_password(request.password, share_link.password_hash):
                 raise ValueError("Invalid password")
 
-        # Get target name
-        target = await self._get_target(
-            ShareTargetType(share_link.target_type),
-            share_link.target_id,
-        )
-        target_name = getattr(target, "name", "Unknown")
-
         # Increment access count
+        now = datetime.datetime.now(datetime.timezone.utc)
         share_link.access_count += 1
-        share_link.last_accessed_at = datetime.datetime.now(datetime.timezone.utc)
-
-        # Log access event
-        audit_event = AuditEvent(
-            event_type="share_accessed",
-            resource_type=share_link.target_type,
-            resource_id=share_link.target_id,
-            user_id=share_link.created_by,  # Owner gets notified
-            details={
+        share_link.last_accessed_at = now
+
+        # Log access event (written in the background when the writer runs)
+        access_log = {
+            "timestamp": now,
+            "action": AuditAction.SHARE_ACCESS.value,
+            "actor_type": ActorType.USER.value,
+            "actor_id": "anonymous",
+            "target_type": share_link.target_type,
+            "target_id": share_link.target_id,
+            "target_name": target_name,
+            "details": {
                 "share_id": str(share_link.id),
                 "visitor_ip": visitor_ip,
                 "access_count": share_link.access_count,
             },
-        )
-        self.db.add(audit_event)
+            "correlation_id": get_correlation_id(),
+            "ip_address": visitor_ip,
+        }
+        if not queue_share_access_log(access_log):
+            self.db.add(AuditEvent(**access_log))
 
         await self.db.commit()
 
@@ -404,7 +500,7 @@ class ShareService:
             share_type=ShareType(share_link.share_type),
             target_type=ShareTargetType(share_link.target_type),
             target_id=share_link.target_id,
-            target_name=target_name,
+            target_name=target_name or "Unknown",
             expires_at=datetime.datetime.now(datetime.timezone.utc) + token_lifetime,
         )
 
@@ -429,26 +525,27 @@ class ShareService:
             return None
 
         # Get access events for this share
-        events_query = select(AuditEvent).where(
+        events_query = select(AuditEvent.timestamp, AuditEvent.ip_address).where(
             and_(
-                AuditEvent.event_type == "share_accessed",
-                AuditEvent.resource_id == share_link.target_id,
+                AuditEvent.action == AuditAction.SHARE_ACCESS.value,
+                AuditEvent.target_id == share_link.target_id,
+                AuditEvent.details["share_id"].astext == str(share_id),
             )
-        ).order_by(AuditEvent.created_at.desc())
+        ).order_by(AuditEvent.timestamp.desc())
 
         events_result = await self.db.execute(events_query)
-        events = events_result.scalars().all()
+        events = events_result.all()
 
         # Calculate statistics
         access_by_date: dict[str, int] = {}
         unique_ips: set[str] = set()
 
-        for event in events:
-            date_key = event.created_at.strftime("%Y-%m-%d")
+        for timestamp, ip_address in events:
+            date_key = timestamp.strftime("%Y-%m-%d")
             access_by_date[date_key] = access_by_date.get(date_key, 0) + 1
 
-            if event.details and "visitor_ip" in event.details:
-                unique_ips.add(event.details["visitor_ip"])
+            if ip_address:
+                unique_ips.add(ip_address)
 
         return ShareStatistics(
             share_id=share_id,
@@ -542,28 +639,133 @@ class ShareService:
         )
 
 
+def queue_share_access_log(access_log: dict) -> bool:
+    """Queue a share access audit row for the background writer.
+
+    Returns False when the writer is not running or is backed up; the
+    caller then writes the row itself.
+    """
+    if _access_log_task is None:
+        return False
+    try:
+        _access_log_queue.put_nowait(access_log)
+        return True
+    except asyncio.QueueFull:
+        logger.warning("share_access_log_queue_full")
+        return False
+
+
+async def _flush_access_logs(db_session_factory, batch: list[dict]) -> None:
+    """Insert a batch of share access audit rows in one statement."""
+    try:
+        async with db_session_factory() as db:
+            await db.execute(insert(AuditEvent), batch)
+            await db.commit()
+    except Exception as e:
+        logger.error("share_access_log_flush_error", count=len(batch), error=str(e))
+
+
+async def start_access_log_writer(db_session_factory):
+    """Start the background share access log writer."""
+    global _access_log_task
+
+    if _access_log_task is not None:
+        return
+
+    async def writer():
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            # Block for the first row, then gather more until the batch is
+            # full or the flush interval has passed
+            row = await _access_log_queue.get()
+            if row is _STOP_WRITER:
+                return
+            batch = [row]
+            deadline = loop.time() + ACCESS_LOG_FLUSH_INTERVAL_SECONDS
+            while len(batch) < ACCESS_LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(_access_log_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP_WRITER:
+                    stopping = True
+                    break
+                batch.append(row)
+            await _flush_access_logs(db_session_factory, batch)
+
+    _access_log_task = asyncio.create_task(writer())
+    logger.info("share_access_log_writer_started")
+
+
+async def stop_access_log_writer(db_session_factory):
+    """Stop the writer and flush whatever is still queued.
+
+    The writer is stopped with a sentinel rather than cancelled, so a batch
+    it has already taken off the queue is still written.
+    """
+    global _access_log_task
+
+    task, _access_log_task = _access_log_task, None
+    if task is not None:
+        # From here on, callers write their rows themselves
+        if not task.done():
+            await _access_log_queue.put(_STOP_WRITER)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    batch = []
+    while not _access_log_queue.empty():
+        batch.append(_access_log_queue.get_nowait())
+    if batch:
+        await _flush_access_logs(db_session_factory, batch)
+    logger.info("share_access_log_writer_stopped", flushed=len(batch))
+
+
 class KeycloakGuestService:
     """Service for managing Keycloak guest accounts."""
 
+    # Refresh the cached admin token this long before Keycloak expires it
+    TOKEN_REFRESH_MARGIN_SECONDS = 30
+
     def __init__(
         self,
         keycloak_url: str,
         realm: str,
         client_id: str,
         client_secret: str,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.keycloak_url = keycloak_url
         self.realm = realm
         self.client_id = client_id
         self.client_secret = client_secret
+        self._client = client
+
+        # Cached client-credentials token and its monotonic refresh deadline
+        self._admin_token: Optional[str] = None
+        self._admin_token_refresh_at = 0.0
+        self._admin_token_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client for Keycloak calls.
+
+        The shared client is looked up per call: this service is cached for
+        the process lifetime and must not hold on to a closed client.
+        """
+        return self._client or get_http_client()
 
     async def create_guest_account(
         self,
         data: GuestAccountCreate,
     ) -> GuestAccountResponse:
         """Create a guest account in Keycloak for share access."""
-        import httpx
-
         # Get admin token
         admin_token = await self._get_admin_token()
 
@@ -590,22 +792,21 @@ class KeycloakGuestService:
             "groups": ["/guests"],
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.keycloak_url}/admin/realms/{self.realm}/users",
-                json=user_data,
-                headers={"Authorization": f"Bearer {admin_token}"},
-            )
+        response = await self.client.post(
+            f"{self.keycloak_url}/admin/realms/{self.realm}/users",
+            json=user_data,
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
 
-            if response.status_code == 409:
-                # User already exists
-                raise ValueError("Guest account already exists for this email")
+        if response.status_code == 409:
+            # User already exists
+            raise ValueError("Guest account already exists for this email")
 
-            response.raise_for_status()
+        response.raise_for_status()
 
-            # Get user ID from location header
-            location = response.headers.get("Location", "")
-            guest_id = location.split("/")[-1] if location else ""
+        # Get user ID from location header
+        location = response.headers.get("Location", "")
+        guest_id = location.split("/")[-1] if location else ""
 
         login_url = (
             f"{self.keycloak_url}/realms/{self.realm}/protocol/openid-connect/auth"
@@ -627,30 +828,32 @@ class KeycloakGuestService:
 
     async def delete_guest_account(self, guest_id: str) -> bool:
         """Delete a guest account from Keycloak."""
-        import httpx
-
         admin_token = await self._get_admin_token()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.keycloak_url}/admin/realms/{self.realm}/users/{guest_id}",
-                headers={"Authorization": f"Bearer {admin_token}"},
-            )
+        response = await self.client.delete(
+            f"{self.keycloak_url}/admin/realms/{self.realm}/users/{guest_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
 
-            if response.status_code == 404:
-                return False
+        if response.status_code == 404:
+            return False
 
-            response.raise_for_status()
+        response.raise_for_status()
 
         logger.info("guest_account_deleted", guest_id=guest_id)
         return True
 
     async def _get_admin_token(self) -> str:
-        """Get an admin token for Keycloak API calls."""
-        import httpx
+        """Get an admin token for Keycloak API calls, reusing it until near expiry."""
+        if self._admin_token and time.monotonic() < self._admin_token_refresh_at:
+            return self._admin_token
+
+        async with self._admin_token_lock:
+            # Another request may have refreshed the token while we waited
+            if self._admin_token and time.monotonic() < self._admin_token_refresh_at:
+                return self._admin_token
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+            response = await self.client.post(
                 f"{self.keycloak_url}/realms/{self.realm}/protocol/openid-connect/token",
                 data={
                     "grant_type": "client_credentials",
@@ -659,4 +862,12 @@ class KeycloakGuestService:
                 },
             )
             response.raise_for_status()
-            return response.json()["access_token"]
+            payload = response.json()
+
+            self._admin_token = payload["access_token"]
+            self._admin_token_refresh_at = (
+                time.monotonic()
+                + payload.get("expires_in", 0)
+                - self.TOKEN_REFRESH_MARGIN_SECONDS
+            )
+            return self._admin_token
@@ -1,9 +1,10 @@
 """MinIO/S3 storage service with chunked upload support."""
 
+import asyncio
 import hashlib
 import io
 import uuid
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import lru_cache
@@ -57,22 +58,50 @@ class StorageService:
             signature_version="s3v4",
             s3={"addressing_style": "path"},
             retries={"max_attempts": 3, "mode": "adaptive"},
+            max_pool_connections=64,
+            tcp_keepalive=True,
         )
+        # Shared S3 client, opened on first use so its connection pool
+        # (and keep-alive sockets) is reused across operations
+        self._client = None
+        self._client_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
         # Track active multipart uploads
         self._active_uploads: Dict[str, MultipartUploadInfo] = {}
 
+    async def connect(self) -> None:
+        """Open the shared S3 client if it is not open yet."""
+        if self._client is not None:
+            return
+        async with self._client_lock:
+            if self._client is None:
+                stack = AsyncExitStack()
+                self._client = await stack.enter_async_context(
+                    self._session.client(
+                        "s3",
+                        endpoint_url=settings.minio_endpoint_url,
+                        aws_access_key_id=settings.minio_access_key,
+                        aws_secret_access_key=settings.minio_secret_key,
+                        region_name=settings.minio_region,
+                        config=self._config,
+                    )
+                )
+                self._client_stack = stack
+                logger.info("storage_client_opened", endpoint=settings.minio_endpoint_url)
+
     @asynccontextmanager
     async def _get_client(self):
-        """Get an S3 client context manager."""
-        async with self._session.client(
-            "s3",
-            endpoint_url=settings.minio_endpoint_url,
-            aws_access_key_id=settings.minio_access_key,
-            aws_secret_access_key=settings.minio_secret_key,
-            region_name=settings.minio_region,
-            config=self._config,
-        ) as client:
-            yield client
+        """Get the shared S3 client context manager."""
+        if self._client is None:
+            await self.connect()
+        yield self._client
+
+    async def close(self) -> None:
+        """Close the shared S3 client and its connection pool."""
+        if self._client_stack is not None:
+            await self._client_stack.aclose()
+            self._client_stack = None
+            self._client = None
 
     # ==========================================================================
     # Bucket Management
@@ -467,9 +496,17 @@ class StorageService:
 
         Yields:
             Chunks of file data
+
+        Raises:
+            FileNotFoundError: If the object does not exist
         """
         async with self._get_client() as client:
-            response = await client.get_object(Bucket=bucket, Key=key)
+            try:
+                response = await client.get_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                    raise FileNotFoundError(f"{bucket}/{key}") from e
+                raise
             async for chunk in response["Body"].iter_chunks(chunk_size=chunk_size):
                 yield chunk
 
@@ -559,17 +596,24 @@ class StorageService:
             await client.delete_object(Bucket=bucket, Key=key)
             logger.info("file_deleted", bucket=bucket, key=key)
 
+    # S3 DeleteObjects accepts at most this many keys per request
+    DELETE_BATCH_SIZE = 1000
+
     async def delete_files(self, bucket: str, keys: List[str]) -> None:
-        """Delete multiple files from storage."""
+        """Delete multiple files from storage, in batches of DELETE_BATCH_SIZE."""
         if not keys:
             return
 
         async with self._get_client() as client:
-            delete_objects = [{"Key": key} for key in keys]
-            await client.delete_objects(
-                Bucket=bucket,
-                Delete={"Objects": delete_objects},
-            )
+            for start in range(0, len(keys), self.DELETE_BATCH_SIZE):
+                delete_objects = [
+                    {"Key": key}
+                    for key in keys[start:start + self.DELETE_BATCH_SIZE]
+                ]
+                await client.delete_objects(
+                    Bucket=bucket,
+                    Delete={"Objects": delete_objects, "Quiet": True},
+                )
             logger.info("files_deleted", bucket=bucket, count=len(keys))
 
     async def copy_file(
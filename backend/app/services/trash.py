@@ -1,11 +1,13 @@
 """Trash service for managing soft-deleted items."""
 
+import asyncio
+import base64
 import datetime
 import uuid
 from typing import Optional
 
 import structlog
-from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy import and_, delete, func, null, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
@@ -27,6 +29,37 @@ from app.services.storage import StorageService
 logger = structlog.get_logger(__name__)
 
 
+def _encode_cursor(deleted_at: datetime.datetime, item_id: uuid.UUID) -> str:
+    """Encode a trash listing position as an opaque cursor."""
+    raw = f"{deleted_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime.datetime, uuid.UUID]:
+    """Decode a cursor from _encode_cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        deleted_at, _, item_id = raw.partition("|")
+        return datetime.datetime.fromisoformat(deleted_at), uuid.UUID(item_id)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _merge_trash_rows(file_rows, dir_rows, limit: int):
+    """Merge file and directory rows into one trash page.
+
+    Each input is that table's next rows, newest first by (deleted_at, id),
+    fetched with limit + 1 so a following page can be detected.
+
+    Returns:
+        The page's (item_type, row) pairs and whether more items follow
+    """
+    rows = [(TrashItemType.FILE, row) for row in file_rows]
+    rows.extend((TrashItemType.DIRECTORY, row) for row in dir_rows)
+    rows.sort(key=lambda item: (item[1].deleted_at, item[1].id), reverse=True)
+    return rows[:limit], len(rows) > limit
+
+
 class TrashService:
     """Service for managing trash/recycle bin operations."""
 
@@ -46,87 +79,110 @@ class TrashService:
         library_id: Optional[uuid.UUID] = None,
         user_id: Optional[uuid.UUID] = None,
         limit: int = 50,
-        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> TrashListResponse:
-        """Get all items in trash."""
-        items: list[TrashItemResponse] = []
-        total_size = 0
+        """Get a page of items in trash, most recently deleted first.
+
+        Pages are keyed on (deleted_at, id): pass the previous page's
+        next_cursor to continue. Each page costs O(limit) regardless of depth.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        now = datetime.datetime.now(datetime.timezone.utc)
+        retention = datetime.timedelta(days=self.retention_days)
 
-        # Query deleted files
         file_conditions = [FileMetadata.is_deleted == True]
+        dir_conditions = [Directory.is_deleted == True]
         if library_id:
             file_conditions.append(FileMetadata.library_id == library_id)
+            dir_conditions.append(Directory.library_id == library_id)
 
-        files_query = (
-            select(FileMetadata)
-            .where(and_(*file_conditions))
-            .order_by(FileMetadata.updated_at.desc())
+        # Totals cover the whole trash, not just this page
+        file_count, total_size = (
+            await self.db.execute(
+                select(
+                    func.count(FileMetadata.id),
+                    func.coalesce(func.sum(FileMetadata.size_bytes), 0),
+                ).where(and_(*file_conditions))
+            )
+        ).one()
+        dir_count = await self.db.scalar(
+            select(func.count(Directory.id)).where(and_(*dir_conditions))
         )
 
-        files_result = await self.db.execute(files_query)
-        deleted_files = files_result.scalars().all()
-
-        for file in deleted_files:
-            expires_at = file.updated_at + datetime.timedelta(days=self.retention_days)
-            days_remaining = (expires_at - datetime.datetime.now(datetime.timezone.utc)).days
-
-            items.append(TrashItemResponse(
-                item_type=TrashItemType.FILE,
-                item_id=file.id,
-                name=file.name,
-                original_path=file.path or f"/{file.name}",
-                library_id=file.library_id,
-                deleted_by=file.updated_by or uuid.uuid4(),  # Fallback
-                deleted_at=file.updated_at,
-                expires_at=expires_at,
-                size_bytes=file.size,
-                days_until_permanent=max(0, days_remaining),
-                can_restore=days_remaining > 0,
-            ))
-            total_size += file.size or 0
-
-        # Query deleted directories
-        dir_conditions = [Directory.is_deleted == True]
-        if library_id:
-            dir_conditions.append(Directory.library_id == library_id)
+        if after:
+            file_conditions.append(
+                tuple_(FileMetadata.deleted_at, FileMetadata.id) < tuple_(*after)
+            )
+            dir_conditions.append(
+                tuple_(Directory.deleted_at, Directory.id) < tuple_(*after)
+            )
 
-        dirs_query = (
-            select(Directory)
+        # One extra row per table tells us whether another page follows
+        files_result = await self.db.execute(
+            select(
+                FileMetadata.id,
+                FileMetadata.filename,
+                FileMetadata.path,
+                FileMetadata.library_id,
+                FileMetadata.deleted_by,
+                FileMetadata.deleted_at,
+                FileMetadata.size_bytes,
+            )
+            .where(and_(*file_conditions))
+            .order_by(FileMetadata.deleted_at.desc(), FileMetadata.id.desc())
+            .limit(limit + 1)
+        )
+        dirs_result = await self.db.execute(
+            select(
+                Directory.id,
+                Directory.name,
+                Directory.path,
+                Directory.library_id,
+                Directory.deleted_by,
+                Directory.deleted_at,
+                null(),
+            )
             .where(and_(*dir_conditions))
-            .order_by(Directory.updated_at.desc())
+            .order_by(Directory.deleted_at.desc(), Directory.id.desc())
+            .limit(limit + 1)
         )
 
-        dirs_result = await self.db.execute(dirs_query)
-        deleted_dirs = dirs_result.scalars().all()
+        rows, has_more = _merge_trash_rows(
+            files_result.all(), dirs_result.all(), limit
+        )
 
-        for dir in deleted_dirs:
-            expires_at = dir.updated_at + datetime.timedelta(days=self.retention_days)
-            days_remaining = (expires_at - datetime.datetime.now(datetime.timezone.utc)).days
+        items: list[TrashItemResponse] = []
+        for item_type, (item_id, name, path, lib_id, deleted_by, deleted_at, size) in rows:
+            expires_at = deleted_at + retention
+            days_remaining = (expires_at - now).days
 
             items.append(TrashItemResponse(
-                item_type=TrashItemType.DIRECTORY,
-                item_id=dir.id,
-                name=dir.name,
-                original_path=dir.path or f"/{dir.name}",
-                library_id=dir.library_id,
-                deleted_by=dir.updated_by or uuid.uuid4(),
-                deleted_at=dir.updated_at,
+                item_type=item_type,
+                item_id=item_id,
+                name=name,
+                original_path=path or f"/{name}",
+                library_id=lib_id,
+                deleted_by=deleted_by or uuid.uuid4(),  # Fallback
+                deleted_at=deleted_at,
                 expires_at=expires_at,
-                size_bytes=None,
+                size_bytes=size,
                 days_until_permanent=max(0, days_remaining),
-                can_restore=days_remaining > 0,
+                can_restore=expires_at > now,
             ))
 
-        # Sort by deleted_at descending
-        items.sort(key=lambda x: x.deleted_at, reverse=True)
-
-        # Apply pagination
-        paginated_items = items[offset:offset + limit]
+        next_cursor = None
+        if has_more:
+            last = items[-1]
+            next_cursor = _encode_cursor(last.deleted_at, last.item_id)
 
         return TrashListResponse(
-            items=paginated_items,
-            total=len(items),
+            items=items,
+            total=file_count + dir_count,
             total_size_bytes=total_size,
+            next_cursor=next_cursor,
         )
 
     async def restore_item(
@@ -161,8 +217,8 @@ class TrashService:
         if not file:
             raise ValueError("File not found in trash")
 
-        # Check expiry
-        expires_at = file.updated_at + datetime.timedelta(days=self.retention_days)
+        # Check expiry (same clock as the trash listing)
+        expires_at = file.deleted_at + datetime.timedelta(days=self.retention_days)
         if datetime.datetime.now(datetime.timezone.utc) > expires_at:
             raise ValueError("File has expired and cannot be restored")
 
@@ -238,8 +294,8 @@ class TrashService:
         if not directory:
             raise ValueError("Directory not found in trash")
 
-        # Check expiry
-        expires_at = directory.updated_at + datetime.timedelta(days=self.retention_days)
+        # Check expiry (same clock as the trash listing)
+        expires_at = directory.deleted_at + datetime.timedelta(days=self.retention_days)
         if datetime.datetime.now(datetime.timezone.utc) > expires_at:
             raise ValueError("Directory has expired and cannot be restored")
 
@@ -376,9 +432,12 @@ class TrashService:
         # Delete from storage
         if self.storage and file.storage_key:
             try:
+                bucket_name = await self.db.scalar(
+                    select(Library.bucket_name).where(Library.id == file.library_id)
+                )
                 await self.storage.delete_file(
-                    bucket_name=f"beacon-lib-{file.library_id}",
-                    object_name=file.storage_key,
+                    bucket=bucket_name,
+                    key=file.storage_key,
                 )
             except Exception as e:
                 logger.warning(
@@ -465,36 +524,63 @@ class TrashService:
         library_id: Optional[uuid.UUID],
         user_id: uuid.UUID,
     ) -> EmptyTrashResponse:
-        """Empty all items from trash."""
-        deleted_count = 0
-        freed_bytes = 0
+        """Empty all items from trash.
 
-        # Get all deleted files
-        file_conditions = [FileMetadata.is_deleted == True]
+        Rows are removed with one DELETE ... RETURNING per table (file
+        versions and nested directories go by ON DELETE CASCADE), then the
+        stored objects are removed in DeleteObjects batches per bucket.
+        """
+        file_conditions = [
+            FileMetadata.is_deleted == True,
+            FileMetadata.library_id == Library.id,
+        ]
+        dir_conditions = [Directory.is_deleted == True]
         if library_id:
             file_conditions.append(FileMetadata.library_id == library_id)
+            dir_conditions.append(Directory.library_id == library_id)
 
-        files_query = select(FileMetadata).where(and_(*file_conditions))
-        files_result = await self.db.execute(files_query)
-        files = files_result.scalars().all()
+        files_result = await self.db.execute(
+            delete(FileMetadata)
+            .where(and_(*file_conditions))
+            .returning(
+                FileMetadata.size_bytes,
+                FileMetadata.storage_key,
+                Library.bucket_name,
+            )
+        )
+        deleted_files = files_result.all()
 
-        for file in files:
-            freed_bytes += file.size or 0
-            await self._permanent_delete_file(file.id, user_id)
-            deleted_count += 1
+        dirs_result = await self.db.execute(
+            delete(Directory).where(and_(*dir_conditions)).returning(Directory.id)
+        )
+        deleted_dir_count = len(dirs_result.all())
 
-        # Get all deleted directories
-        dir_conditions = [Directory.is_deleted == True]
-        if library_id:
-            dir_conditions.append(Directory.library_id == library_id)
+        await self.db.commit()
 
-        dirs_query = select(Directory).where(and_(*dir_conditions))
-        dirs_result = await self.db.execute(dirs_query)
-        directories = dirs_result.scalars().all()
+        freed_bytes = sum(size or 0 for size, _, _ in deleted_files)
+        keys_by_bucket: dict[str, list[str]] = {}
+        for _, storage_key, bucket_name in deleted_files:
+            if storage_key:
+                keys_by_bucket.setdefault(bucket_name, []).append(storage_key)
+
+        if self.storage and keys_by_bucket:
+            outcomes = await asyncio.gather(
+                *(
+                    self.storage.delete_files(bucket=bucket, keys=keys)
+                    for bucket, keys in keys_by_bucket.items()
+                ),
+                return_exceptions=True,
+            )
+            for bucket, outcome in zip(keys_by_bucket, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.warning(
+                        "storage_delete_failed",
+                        bucket=bucket,
+                        count=len(keys_by_bucket[bucket]),
+                        error=str(outcome),
+                    )
 
-        for directory in directories:
-            await self._permanent_delete_directory(directory.id, user_id)
-            deleted_count += 1
+        deleted_count = len(deleted_files) + deleted_dir_count
 
         logger.info(
             "trash_emptied",
@@ -524,7 +610,7 @@ class TrashService:
         files_query = select(FileMetadata).where(
             and_(
                 FileMetadata.is_deleted == True,
-                FileMetadata.updated_at < cutoff_date,
+                FileMetadata.deleted_at < cutoff_date,
             )
         )
 
@@ -539,7 +625,7 @@ class TrashService:
         dirs_query = select(Directory).where(
             and_(
                 Directory.is_deleted == True,
-                Directory.updated_at < cutoff_date,
+                Directory.deleted_at < cutoff_date,
             )
         )
 
@@ -0,0 +1,19 @@
+"""Tests for converting vector store distances to one scale."""
+
+import numpy as np
+import pytest
+
+from app.services.search import _cosine_distance
+
+
+@pytest.mark.parametrize("cos", [1.0, 0.5, 0.0, -0.5])
+def test_metrics_agree_on_unit_vectors(cos):
+    a = np.array([1.0, 0.0])
+    b = np.array([cos, np.sqrt(1 - cos**2)])
+
+    l2 = float(np.sum((a - b) ** 2))
+    ip = 1 - float(a @ b)
+
+    assert _cosine_distance(l2, "l2") == pytest.approx(1 - cos)
+    assert _cosine_distance(ip, "ip") == pytest.approx(1 - cos)
+    assert _cosine_distance(1 - cos, "cosine") == pytest.approx(1 - cos)
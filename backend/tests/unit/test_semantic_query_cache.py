@@ -0,0 +1,156 @@
+"""Tests for the in-process semantic search result cache."""
+
+import numpy as np
+import pytest
+
+from app.services import search
+from app.services.search import SemanticQueryCache
+
+DIM = 8
+FILTERS = ("library-a", None)
+
+
+def _unit(*components: float) -> np.ndarray:
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[: len(components)] = components
+    return SemanticQueryCache.normalize(vector.tolist())
+
+
+def _results(name: str) -> list:
+    return [{"file_id": name, "score": 1.0}]
+
+
+def _assert_consistent(cache: SemanticQueryCache) -> None:
+    """Buckets and matrices must describe exactly the live entries."""
+    bucketed = [key for keys in cache._buckets.values() for key in keys]
+    assert sorted(bucketed, key=repr) == sorted(cache._entries, key=repr)
+    assert all(keys for keys in cache._buckets.values())
+    for filters, (matrix, scales) in cache._matrices.items():
+        assert matrix.shape[0] == len(scales) == len(cache._buckets[filters])
+
+
+@pytest.fixture(params=["simsimd", "numpy"])
+def cache(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(search, "simsimd", None)
+    elif search.simsimd is None:
+        pytest.skip("simsimd not installed")
+    return SemanticQueryCache(threshold=0.95, ttl_seconds=60, max_entries=3)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_exact_hit(cache):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+
+    assert cache.get_exact(FILTERS, "invoices") == _results("a")
+    assert cache.get_exact(FILTERS, "receipts") is None
+    assert cache.get_exact(("library-b", None), "invoices") is None
+
+
+def test_similar_hit_above_threshold(cache):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+    cache.put(FILTERS, "contracts", _unit(0, 1), _results("b"))
+
+    # cos ~= 0.995 with "invoices", ~= 0.1 with "contracts"
+    assert cache.get_similar(FILTERS, _unit(1, 0.1)) == _results("a")
+
+
+def test_similar_miss_below_threshold(cache):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+
+    # cos ~= 0.89
+    assert cache.get_similar(FILTERS, _unit(1, 0.5)) is None
+
+
+def test_similar_only_matches_same_filters(cache):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+
+    assert cache.get_similar(("library-b", None), _unit(1)) is None
+
+
+def test_similar_ignores_other_embedding_sizes(cache):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+
+    other = SemanticQueryCache.normalize([1.0] + [0.0] * (DIM * 2 - 1))
+    assert cache.get_similar(FILTERS, other) is None
+
+
+def test_entries_expire(cache, clock):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+    cache.put(FILTERS, "contracts", _unit(0, 1), _results("b"))
+    assert cache.get_similar(FILTERS, _unit(1)) == _results("a")
+
+    clock[0] += 61
+
+    # A similar match on an expired entry is a miss and drops the entry
+    assert cache.get_similar(FILTERS, _unit(1)) is None
+    assert (FILTERS, "invoices") not in cache._entries
+    _assert_consistent(cache)
+
+    assert cache.get_exact(FILTERS, "contracts") is None
+    assert not cache._entries
+    _assert_consistent(cache)
+
+
+def test_put_replaces_existing_entry(cache):
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+    cache.put(FILTERS, "invoices", _unit(0, 1), _results("b"))
+
+    assert cache.get_exact(FILTERS, "invoices") == _results("b")
+    assert cache._buckets[FILTERS] == [(FILTERS, "invoices")]
+    assert cache.get_similar(FILTERS, _unit(1)) is None
+    _assert_consistent(cache)
+
+
+def test_lru_eviction_keeps_buckets_and_matrices_consistent(cache):
+    other_filters = ("library-b", None)
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+    cache.put(other_filters, "contracts", _unit(0, 1), _results("b"))
+    cache.put(FILTERS, "receipts", _unit(0, 0, 1), _results("c"))
+
+    # Build both similarity matrices (a miss still builds one), and touch
+    # "invoices" so the oldest entry is now "contracts"
+    assert cache.get_similar(FILTERS, _unit(1)) == _results("a")
+    assert cache.get_similar(other_filters, _unit(1)) is None
+    assert other_filters in cache._matrices
+    _assert_consistent(cache)
+
+    cache.put(FILTERS, "statements", _unit(0, 0, 0, 1), _results("d"))
+
+    assert (other_filters, "contracts") not in cache._entries
+    assert other_filters not in cache._buckets
+    assert other_filters not in cache._matrices
+    assert cache.get_similar(other_filters, _unit(0, 1)) is None
+    _assert_consistent(cache)
+
+    # Evicting "invoices" next must not leave a stale matrix row behind
+    assert cache.get_similar(FILTERS, _unit(0, 0, 1)) == _results("c")
+    cache.put(FILTERS, "reports", _unit(0, 0, 0, 0, 1), _results("e"))
+
+    assert (FILTERS, "invoices") not in cache._entries
+    assert cache.get_similar(FILTERS, _unit(1)) is None
+    assert cache.get_similar(FILTERS, _unit(0, 0, 0, 1)) == _results("d")
+    assert len(cache._entries) == 3
+    _assert_consistent(cache)
+
+
+def test_invalidate_drops_matching_buckets(cache):
+    other_filters = ("library-b", None)
+    cache.put(FILTERS, "invoices", _unit(1), _results("a"))
+    cache.put(FILTERS, "receipts", _unit(0, 1), _results("b"))
+    cache.put(other_filters, "contracts", _unit(0, 0, 1), _results("c"))
+    assert cache.get_similar(FILTERS, _unit(1)) == _results("a")
+
+    cache.invalidate(lambda filters: filters[0] == "library-a")
+
+    assert cache.get_exact(FILTERS, "invoices") is None
+    assert cache.get_similar(FILTERS, _unit(1)) is None
+    assert FILTERS not in cache._matrices
+    assert cache.get_exact(other_filters, "contracts") == _results("c")
+    _assert_consistent(cache)
@@ -0,0 +1,91 @@
+"""Tests for trash listing cursors and page merging."""
+
+import datetime
+import uuid
+from collections import namedtuple
+
+import pytest
+
+from app.schemas.trash import TrashItemType
+from app.services.trash import _decode_cursor, _encode_cursor, _merge_trash_rows
+
+# Same column order as the trash listing queries
+Row = namedtuple(
+    "Row",
+    ["id", "name", "path", "library_id", "deleted_by", "deleted_at", "size"],
+)
+
+BASE_TIME = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _row(minutes: int) -> Row:
+    return Row(
+        id=uuid.uuid4(),
+        name="item",
+        path=None,
+        library_id=uuid.uuid4(),
+        deleted_by=None,
+        deleted_at=BASE_TIME + datetime.timedelta(minutes=minutes),
+        size=None,
+    )
+
+
+def _fetch(rows, after, limit):
+    """Mimic one table's keyset query: (deleted_at, id) < after, newest first."""
+    key = lambda row: (row.deleted_at, row.id)
+    if after is not None:
+        rows = [row for row in rows if key(row) < after]
+    return sorted(rows, key=key, reverse=True)[: limit + 1]
+
+
+def test_cursor_round_trip():
+    deleted_at = BASE_TIME + datetime.timedelta(microseconds=123)
+    item_id = uuid.uuid4()
+
+    assert _decode_cursor(_encode_cursor(deleted_at, item_id)) == (deleted_at, item_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm8tc2VwYXJhdG9y", ""])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 50])
+def test_pages_cover_files_and_directories_exactly_once(limit):
+    # Interleaved timestamps, including a file and a directory deleted at
+    # the same instant, so ties are broken by id across tables
+    files = [_row(m) for m in (0, 2, 3, 3, 7, 9)]
+    dirs = [_row(m) for m in (1, 3, 4, 8)]
+    expected = sorted(
+        [(TrashItemType.FILE, row) for row in files]
+        + [(TrashItemType.DIRECTORY, row) for row in dirs],
+        key=lambda item: (item[1].deleted_at, item[1].id),
+        reverse=True,
+    )
+
+    seen = []
+    cursor = None
+    while True:
+        after = _decode_cursor(cursor) if cursor else None
+        page, has_more = _merge_trash_rows(
+            _fetch(files, after, limit), _fetch(dirs, after, limit), limit
+        )
+        assert len(page) <= limit
+        seen.extend(page)
+        if not has_more:
+            break
+        last = page[-1][1]
+        cursor = _encode_cursor(last.deleted_at, last.id)
+
+    assert seen == expected
+
+
+def test_merge_reports_no_more_on_exact_fit():
+    files = [_row(0)]
+    dirs = [_row(1)]
+
+    page, has_more = _merge_trash_rows(files, dirs, limit=2)
+
+    assert [row for _, row in page] == [dirs[0], files[0]]
+    assert not has_more